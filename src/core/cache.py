@@ -0,0 +1,150 @@
+import os
+import json
+import hashlib
+import pickle
+import shutil
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "gitwizard")
+MAX_CACHED_REPOS = 10
+# Кэш, которым пользовались недавно, не удаляется: с ним может работать запущенный экземпляр
+PRUNE_MIN_AGE = 24 * 60 * 60
+
+class CommitCache:
+    """Кэш метаданных коммитов на диске, привязанный к HEAD ветки"""
+
+    def __init__(self, repo_path: str):
+        repo_key = hashlib.md5(os.path.abspath(repo_path).encode('utf-8')).hexdigest()
+        self.cache_dir = os.path.join(CACHE_DIR, repo_key)
+        self.cache_file = os.path.join(self.cache_dir, "commits.pickle")
+        self.authors_file = os.path.join(self.cache_dir, "authors.json")
+        self.search_index_file = os.path.join(self.cache_dir, "search_index.pickle")
+        self.analysis_file = os.path.join(self.cache_dir, "analysis.json")
+        self.entries: Optional[Dict[str, Tuple[str, List[Tuple]]]] = None
+        # Время изменения каталога - метка последнего использования для _prune,
+        # поэтому обновляем ее и при сессиях, которые кэш только читают
+        try:
+            os.utime(self.cache_dir)
+        except OSError:
+            pass
+
+    def get(self, branch: str) -> Optional[Tuple[str, List[Tuple]]]:
+        """Получение (HEAD, коммиты) для ветки"""
+        if self.entries is None:
+            self.entries = self.load()
+        return self.entries.get(branch)
+
+    def put(self, branch: str, head: str, commits: List[Tuple]) -> None:
+        """Сохранение коммитов ветки для указанного HEAD"""
+        if self.entries is None:
+            self.entries = self.load()
+        self.entries[branch] = (head, commits)
+        self.save()
+
+    def get_authors(self, branch: str) -> Optional[Dict[str, Any]]:
+        """Получение {'last_scanned': хеш, 'author_counts': {...}} для ветки"""
+        try:
+            with open(self.authors_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get(branch)
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def put_authors(self, branch: str, last_scanned: str, author_counts: Dict[str, int]) -> bool:
+        """Сохранение счетчиков авторов ветки до указанного коммита"""
+        try:
+            with open(self.authors_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        entries[branch] = {'last_scanned': last_scanned, 'author_counts': author_counts}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f"{self.authors_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_file, self.authors_file)
+        except OSError:
+            return False
+        self._prune()
+        return True
+
+    def get_search_index(self, head: str) -> Optional[Any]:
+        """Получение поискового индекса, построенного для указанного HEAD"""
+        try:
+            with open(self.search_index_file, 'rb') as f:
+                index_head, index = pickle.load(f)
+            return index if index_head == head else None
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ValueError, TypeError, ImportError):
+            return None
+
+    def put_search_index(self, head: str, index: Any) -> bool:
+        """Сохранение поискового индекса для указанного HEAD"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f"{self.search_index_file}.tmp"
+            with open(tmp_file, 'wb') as f:
+                pickle.dump((head, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.search_index_file)
+        except OSError:
+            return False
+        self._prune()
+        return True
+
+    def get_analysis(self, version: int) -> Dict[str, Any]:
+        """Получение результатов анализа файлов, сохраненных указанной версией анализатора"""
+        try:
+            with open(self.analysis_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data['results'] if data.get('version') == version else {}
+        except (OSError, ValueError, AttributeError, KeyError, TypeError):
+            return {}
+
+    def put_analysis(self, version: int, results: Dict[str, Any]) -> bool:
+        """Сохранение результатов анализа файлов"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f"{self.analysis_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': version, 'results': results}, f, ensure_ascii=False)
+            os.replace(tmp_file, self.analysis_file)
+        except OSError:
+            return False
+        self._prune()
+        return True
+
+    def load(self) -> Dict[str, Tuple[str, List[Tuple]]]:
+        """Загрузка кэша с диска"""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                entries = pickle.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ValueError):
+            return {}
+
+    def save(self) -> bool:
+        """Сохранение кэша на диск"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Пишем во временный файл, чтобы не оставить на диске обрезанный кэш
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(self.entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            return False
+        self._prune()
+        return True
+
+    def _prune(self) -> None:
+        """Удаление кэшей давно не использовавшихся репозиториев"""
+        # Ошибки очистки не влияют на результат записи: кэш текущего репозитория уже сохранен
+        try:
+            repo_dirs = [(entry.stat().st_mtime, entry.path) for entry in os.scandir(CACHE_DIR) if entry.is_dir()]
+        except OSError:
+            return
+        repo_dirs.sort(reverse=True)
+        stale_before = time.time() - PRUNE_MIN_AGE
+        for mtime, path in repo_dirs[MAX_CACHED_REPOS:]:
+            if mtime < stale_before:
+                shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,13 @@
+import time
+from functools import lru_cache
+
+DATE_FORMAT = '%Y-%m-%d %H:%M'
+
+def format_timestamp(timestamp: float) -> str:
+    """Форматирование времени коммита без создания объекта datetime"""
+    # Формат точен до минуты: коммиты одной минуты (серии, rebase) форматируются один раз
+    return _format_minute(int(timestamp) // 60)
+
+@lru_cache(maxsize=4096)
+def _format_minute(minute: int) -> str:
+    return time.strftime(DATE_FORMAT, time.localtime(minute * 60))
@@ -1,14 +1,106 @@
-from typing import List, Optional, Dict
+import os
+import shutil
+import subprocess
+from collections import Counter
+from itertools import islice
+from typing import List, Optional, Dict, Iterator, Sequence, Set, Tuple, Any
 from datetime import datetime
-from git import Repo, GitCommandError, Commit, Diff
+from git import Repo, GitCommandError, Commit, Diff, GitCmdObjectDB, GitDB, NULL_TREE, SymbolicReference, BadName, BadObject
+from core.cache import CommitCache
+
+# ripgrep необязателен: без него поиск по файлам идет через git grep
+RG_PATH = shutil.which('rg')
+
+try:
+    import pygit2
+except ImportError:  # pygit2 необязателен: без него история читается через git log
+    pygit2 = None
+
+# Сколько диффов коммитов держать в памяти (патчи больших коммитов занимают мегабайты)
+DIFF_CACHE_SIZE = 32
+
+# Поля, доступные для потокового чтения истории через git log
+LOG_FIELDS = {
+    'hexsha': '%H',
+    'author': '%an',
+    'committed_date': '%ct',
+    'summary': '%s',
+    'message': '%B',
+    'parents': '%P',
+}
+DEFAULT_LOG_FIELDS = ('hexsha', 'author', 'committed_date', 'summary')
+CACHED_LOG_FIELDS = ('hexsha', 'author', 'committed_date', 'message')
+
+def _message_subject(message: str) -> str:
+    """Тема коммита по правилу %s в git log: строки первого абзаца, соединенные пробелом"""
+    subject = []
+    for line in message.split('\n'):
+        line = line.rstrip()
+        if line:
+            subject.append(line)
+        elif subject:
+            break
+    return ' '.join(subject)
+
+# Те же поля при обходе истории через libgit2
+PYGIT2_LOG_FIELDS = {
+    'hexsha': lambda commit: str(commit.id),
+    'author': lambda commit: commit.author.name,
+    'committed_date': lambda commit: commit.commit_time,
+    'summary': lambda commit: _message_subject(commit.message),
+    'message': lambda commit: commit.message,
+    'parents': lambda commit: ' '.join(str(parent_id) for parent_id in commit.parent_ids),
+}
+
+# Бэкенд объектной базы: git cat-file быстрее при массовом чтении коммитов,
+# GITWIZARD_ODB=gitdb переключает на чистый Python (например, для тестов)
+OBJECT_DB_BACKENDS = {
+    'gitcmd': GitCmdObjectDB,
+    'gitdb': GitDB,
+}
+
+ERE_SPECIAL_CHARS = set('.[]()*+?{}|^$\\')
+
+def _case_insensitive_ere(query: str) -> str:
+    """Построение регулярного выражения POSIX ERE без учета регистра"""
+    parts = []
+    for char in query:
+        variants = sorted({char, char.lower(), char.upper()})
+        escaped = ['\\' + v if v in ERE_SPECIAL_CHARS else v for v in variants]
+        parts.append(escaped[0] if len(escaped) == 1 else f"({'|'.join(escaped)})")
+    return ''.join(parts)
+
+def _raw_extension(path: str) -> Optional[str]:
+    """Расширение файла без точки и без приведения регистра (None, если расширения нет)"""
+    # Те же правила, что у os.path.splitext: ведущие точки имени (.gitignore) расширением не считаются
+    stem, _, ext = path.rpartition('/')[2].rpartition('.')
+    return ext if stem.strip('.') else None
 
 class GitRepository:
     def __init__(self, repo_path: str = "."):
         self.repo_path = repo_path
         try:
-            self.repo = Repo(self.repo_path)
+            odbt = OBJECT_DB_BACKENDS.get(os.environ.get('GITWIZARD_ODB', 'gitcmd').lower(), GitCmdObjectDB)
+            self.repo = Repo(self.repo_path, odbt=odbt)
         except GitCommandError:
             raise ValueError(f"Директория {repo_path} не является Git репозиторием")
+        self.commit_cache = CommitCache(self.repo.working_dir)
+        self._pg = None
+        if pygit2:
+            try:
+                self._pg = pygit2.Repository(self.repo.working_dir)
+            except (pygit2.GitError, ValueError, KeyError):
+                # libgit2 может не поддерживать расширения или формат репозитория: работаем через git
+                pass
+        self._files: Optional[Tuple[Any, List[str]]] = None
+        # SHA blob-объектов обычных файлов индекса: (состояние файла индекса, путь -> SHA)
+        self._index_shas: Optional[Tuple[Any, Dict[str, str]]] = None
+        # Счетчик расширений для списка файлов, по которому он построен: (список, счетчик)
+        self._file_types: Optional[Tuple[List[str], Counter]] = None
+        # Счетчики авторов последней запрошенной ветки: (ветка, HEAD, счетчики)
+        self._author_counts: Optional[Tuple[str, str, Counter]] = None
+        # Диффы коммитов неизменны, поэтому хранятся по хешу: (хеш, путь, с патчем) -> диффы
+        self._diffs: Dict[Tuple[str, Optional[str], bool], List[Diff]] = {}
 
     @property
     def active_branch(self):
@@ -29,44 +121,375 @@ class GitRepository:
     def get_modified_files(self) -> List[str]:
         return [item.a_path for item in self.repo.index.diff(None)]
 
+    def get_status(self) -> Tuple[List[str], List[str]]:
+        """Измененные и неотслеживаемые файлы одним вызовом git status"""
+        output = self.repo.git.status('--porcelain=v1', '-z', '--untracked-files=all')
+        modified, untracked = [], []
+        entries = iter(output.split('\x00'))
+        for entry in entries:
+            if not entry:
+                continue
+            code, path = entry[:2], entry[3:]
+            if code == '??':
+                untracked.append(path)
+                continue
+            modified.append(path)
+            if 'R' in code or 'C' in code:
+                next(entries, None)  # Исходное имя переименованного/скопированного файла
+        return modified, untracked
+
     def get_last_commit(self) -> Commit:
         return self.repo.head.commit
 
     def get_branches(self) -> List[str]:
         return [branch.name for branch in self.repo.heads]
 
+    def get_branch_heads(self) -> Dict[str, str]:
+        """Хеши вершин локальных веток одним вызовом git for-each-ref"""
+        output = self.repo.git.for_each_ref('--format=%(refname:short)%00%(objectname)', 'refs/heads/')
+        return dict(line.split('\x00') for line in output.splitlines())
+
+    def resolve_commit(self, rev: str) -> str:
+        """Хеш коммита, на который указывает ревизия; вычисляется внутри процесса"""
+        try:
+            if self._pg is not None:
+                return str(self._pg.revparse_single(rev).peel(pygit2.Commit).id)
+            return self.repo.rev_parse(f'{rev}^{{commit}}').hexsha
+        except (BadName, BadObject, KeyError, ValueError, IndexError):
+            raise ValueError(f"Ревизия {rev} не найдена")
+
+    def get_merge_base(self, rev: str, other: str) -> Optional[str]:
+        """Общий предок двух ревизий (None, если истории не пересекаются)"""
+        if self._pg is not None:
+            # libgit2 находит общего предка внутри процесса, без запуска git merge-base
+            try:
+                base = self._pg.merge_base(self._pg.revparse_single(rev).peel(pygit2.Commit).id,
+                                           self._pg.revparse_single(other).peel(pygit2.Commit).id)
+            except (KeyError, ValueError):
+                raise ValueError(f"Ревизия {other} не найдена")
+            return str(base) if base else None
+        try:
+            return self.repo.git.merge_base('--end-of-options', rev, other)
+        except GitCommandError as e:
+            if e.status == 1:
+                return None
+            raise ValueError(f"Ревизия {other} не найдена")
+
+    def get_changes_since(self, base: str, rev: str) -> Dict[str, List]:
+        """Файлы, измененные между ревизиями: [хеш нового блоба, добавлено строк, удалено строк]"""
+        # --raw и --numstat в одном вызове: сначала записи с хешами блобов, затем счетчики строк
+        output = self.repo.git.diff_tree('-r', '-z', '--raw', '--numstat', '--no-renames',
+                                         '--end-of-options', base, rev, '--')
+        changes = {}
+        tokens = iter(output.split('\x00'))
+        for token in tokens:
+            if token.startswith(':'):
+                changes[next(tokens)] = [token.split()[3], 0, 0]
+            elif token:
+                insertions, deletions, path = token.split('\t', 2)
+                # Для бинарных файлов git выводит '-' вместо количества строк
+                changes[path][1] = int(insertions) if insertions != '-' else 0
+                changes[path][2] = int(deletions) if deletions != '-' else 0
+        return changes
+
     def get_commits(self, branch: Optional[str] = None) -> List[Commit]:
         if branch:
             return list(self.repo.iter_commits(branch))
         return list(self.repo.iter_commits())
 
-    def get_diff(self, commit_hash: Optional[str] = None, file_path: Optional[str] = None) -> List[Diff]:
+    def iter_log(self, *args: str, fields: Sequence[str] = DEFAULT_LOG_FIELDS, **kwargs: Any) -> Iterator[Tuple]:
+        """Потоковое чтение истории: через libgit2, если доступен pygit2, иначе одним процессом git log"""
+        if self._pg is not None and len(args) <= 1 and set(kwargs) <= {'max_count'}:
+            return self._iter_log_pygit2(args[0] if args else 'HEAD', kwargs.get('max_count'), fields)
+        return self._iter_log_git(*args, fields=fields, **kwargs)
+
+    def _iter_log_pygit2(self, rev: str, max_count: Optional[int], fields: Sequence[str]) -> Iterator[Tuple]:
+        """Обход истории внутри процесса через libgit2, без запуска git"""
+        exclude, separator, include = rev.partition('..')
+        if not separator:
+            include, exclude = exclude, ''
+        walker = self._pg.walk(self._pg.revparse_single(include or 'HEAD').id, pygit2.GIT_SORT_TIME)
+        if exclude:
+            walker.hide(self._pg.revparse_single(exclude).id)
+        getters = [PYGIT2_LOG_FIELDS[field] for field in fields]
+        for commit in islice(walker, max_count):
+            yield tuple(getter(commit) for getter in getters)
+
+    def _iter_log_git(self, *args: str, fields: Sequence[str] = DEFAULT_LOG_FIELDS, **kwargs: Any) -> Iterator[Tuple]:
+        """Потоковое чтение истории одним процессом git log без создания объектов Commit"""
+        log_format = '%x00'.join(LOG_FIELDS[field] for field in fields)
+        date_index = fields.index('committed_date') if 'committed_date' in fields else -1
+        record = []
+        for token in self._iter_log_tokens(f'--format={log_format}', *args, **kwargs):
+            record.append(token)
+            if len(record) == len(fields):
+                if date_index >= 0:
+                    record[date_index] = int(record[date_index])
+                yield tuple(record)
+                record = []
+
+    def _iter_log_tokens(self, *args: str, **kwargs: Any) -> Iterator[str]:
+        """Потоковое чтение вывода git log -z по значениям, разделенным нулевым байтом"""
+        process = self.repo.git.log('-z', *args, as_process=True, **kwargs)
+        tail = b''
+        try:
+            for chunk in iter(lambda: process.stdout.read(65536), b''):
+                parts = (tail + chunk).split(b'\x00')
+                tail = parts.pop()
+                for part in parts:
+                    yield part.decode('utf-8', errors='replace')
+            process.wait()
+        finally:
+            process.stdout.close()
+
+    def write_commit_graph(self) -> None:
+        """Запись commit-graph с фильтрами Блума по измененным путям"""
+        # git читает commit-graph сам (core.commitGraph включен по умолчанию): обход истории
+        # не разбирает объекты коммитов, а логи по файлу пропускают не затронувшие его коммиты
+        self.repo.git.commit_graph('write', '--reachable', '--changed-paths')
+
+    def iter_file_changes(self, file_path: Optional[str] = None) -> Iterator[Tuple[int, List[str]]]:
+        """Время коммита и список измененных в нем файлов для всей истории, одним процессом git log"""
+        pathspec = ('--', f":(literal){file_path}") if file_path else ()
+        committed_date = None
+        paths = []
+        # Каждый коммит начинается с маркера \x01, за временем коммита идут имена файлов
+        for token in self._iter_log_tokens('--name-only', '--format=%x01%ct', *pathspec):
+            if token.startswith('\x01'):
+                if committed_date is not None:
+                    yield committed_date, paths
+                committed_date = int(token[1:])
+                paths = []
+            elif token:
+                paths.append(token.lstrip('\n'))
+        if committed_date is not None:
+            yield committed_date, paths
+
+    def _head_state(self) -> Tuple[str, str]:
+        """Текущая ветка ('HEAD' при отсоединенном HEAD) и хеш ее вершины без чтения объекта коммита"""
+        try:
+            ref = self.repo.head.reference
+        except TypeError:
+            return 'HEAD', SymbolicReference.dereference_recursive(self.repo, 'HEAD')
+        return ref.name, SymbolicReference.dereference_recursive(self.repo, ref.path)
+
+    def get_log(self) -> List[Tuple[str, str, int, str]]:
+        """Метаданные коммитов текущей ветки (хеш, автор, дата, сообщение) с кэшем по HEAD"""
+        branch, head = self._head_state()
+        cached = self.commit_cache.get(branch)
+        if cached and cached[0] == head:
+            return cached[1]
+
+        if cached and self._is_ancestor(cached[0], head):
+            # HEAD продвинулся вперед: дочитываем только новые коммиты
+            commits = list(self.iter_log(f"{cached[0]}..{head}", fields=CACHED_LOG_FIELDS)) + cached[1]
+        else:
+            commits = list(self.iter_log(head, fields=CACHED_LOG_FIELDS))
+        self.commit_cache.put(branch, head, commits)
+        return commits
+
+    def iter_lost_commits(self) -> Iterator[Tuple[str, str, int, str]]:
+        """Коммиты из reflog и прочих ссылок, недостижимые ни из одной ветки, тега или удаленной ветки"""
+        return self._iter_log_git('--reflog', '--all', '--not', '--branches', '--tags', '--remotes')
+
+    def grep_log(self, query: str, max_count: Optional[int] = None) -> Iterator[Tuple[str, str, int, str]]:
+        """Коммиты текущей ветки, в сообщении которых есть строка (без учета регистра); фильтрует сам git"""
+        if query.isascii():
+            pattern_args = ('-i', '-F', f'--grep={query}')
+        else:
+            # Как и в git grep, -i без UTF-8 локали не учитывает регистр не-ASCII символов
+            pattern_args = ('-E', f'--grep={_case_insensitive_ere(query)}')
+        return self._iter_log_git(*pattern_args, fields=CACHED_LOG_FIELDS, max_count=max_count)
+
+    def get_author_counts(self) -> Counter:
+        """Количество коммитов по авторам текущей ветки с инкрементальным дочитыванием истории"""
+        branch, head = self._head_state()
+        if self._author_counts and self._author_counts[:2] == (branch, head):
+            return Counter(self._author_counts[2])
+
+        cached = self.commit_cache.get_authors(branch)
+        if cached and cached['last_scanned'] == head:
+            counts = Counter(cached['author_counts'])
+            self._author_counts = (branch, head, counts)
+            return Counter(counts)
+
+        if cached and self._is_ancestor(cached['last_scanned'], head):
+            # Предки последнего просмотренного коммита уже учтены
+            counts = Counter(cached['author_counts'])
+            counts.update(self._shortlog(f"{cached['last_scanned']}..{head}"))
+        else:
+            counts = self._shortlog(head)
+        self.commit_cache.put_authors(branch, head, dict(counts))
+        self._author_counts = (branch, head, counts)
+        return Counter(counts)
+
+    def _shortlog(self, rev: str) -> Counter:
+        """Подсчет коммитов по авторам одним вызовом git shortlog"""
+        # Ревизия указывается явно: без нее shortlog читает лог из stdin.
+        # --group=format: требует git новее 2.31, поэтому группируем по умолчанию:
+        # по имени автора с учетом .mailmap
+        output = self.repo.git.shortlog('-s', rev)
+        counts = Counter()
+        for line in output.splitlines():
+            count, _, author = line.lstrip().partition('\t')
+            counts[author] = int(count)
+        return counts
+
+    def _is_ancestor(self, ancestor: str, rev: str) -> bool:
+        try:
+            return self.repo.is_ancestor(ancestor, rev)
+        except (GitCommandError, ValueError):
+            return False
+
+    def get_diff(self, commit_hash: Optional[str] = None, file_path: Optional[str] = None, create_patch: bool = False) -> List[Diff]:
         if commit_hash:
             commit = self.repo.commit(commit_hash)
         else:
             commit = self.repo.head.commit
 
-        if file_path:
-            return commit.diff(commit.parents[0] if commit.parents else None, paths=[file_path])
-        return commit.diff(commit.parents[0] if commit.parents else None)
+        key = (commit.hexsha, file_path, create_patch)
+        diffs = self._diffs.get(key)
+        if diffs is not None:
+            return diffs
+
+        paths = [file_path] if file_path else None
+        if commit.parents:
+            # R=True: сторона a — родитель, сторона b — сам коммит
+            diffs = commit.diff(commit.parents[0], paths=paths, create_patch=create_patch, R=True)
+        else:
+            diffs = commit.diff(NULL_TREE, paths=paths, create_patch=create_patch)
+        if len(self._diffs) >= DIFF_CACHE_SIZE:
+            # Вытесняется самый старый дифф
+            del self._diffs[next(iter(self._diffs))]
+        self._diffs[key] = diffs
+        return diffs
 
     def get_file_content(self, commit_hash: str, file_path: str) -> str:
-        return self.repo.git.show(f"{commit_hash}:{file_path}")
+        """Содержимое файла в коммите; блоб читается из базы объектов без запуска git show"""
+        try:
+            if self._pg is not None:
+                entry = self._pg.revparse_single(commit_hash).peel(pygit2.Commit).tree[file_path]
+                is_blob = entry.type_str == 'blob'
+            else:
+                entry = self.repo.commit(commit_hash).tree[file_path]
+                is_blob = entry.type == 'blob'
+        except (BadName, BadObject, KeyError, ValueError):
+            is_blob = False
+        if not is_blob:
+            raise ValueError(f"Файл {file_path} не найден в коммите {commit_hash}")
+        data = entry.data if self._pg is not None else entry.data_stream.read()
+        return data.decode('utf-8', errors='replace')
 
     def get_stats(self, commit_hash: Optional[str] = None) -> Dict:
-        if commit_hash:
-            commit = self.repo.commit(commit_hash)
-        else:
-            commit = self.repo.head.commit
-        return commit.stats.total
+        return self._numstat(commit_hash)[1]
 
-    def get_file_stats(self, commit_hash: Optional[str] = None) -> Dict:
-        if commit_hash:
-            commit = self.repo.commit(commit_hash)
+    def get_file_stats(self, commit_hash: Optional[str] = None, file_path: Optional[str] = None) -> Dict:
+        return self._numstat(commit_hash, file_path)[0]
+
+    def _numstat(self, commit_hash: Optional[str] = None, file_path: Optional[str] = None) -> Tuple[Dict[str, Dict[str, int]], Dict[str, int]]:
+        """Статистика изменений коммита относительно первого родителя одним вызовом git diff-tree"""
+        # Родителя git находит сам: коммит не загружается в Python отдельным запросом
+        rev = commit_hash or 'HEAD'
+        # Для одного файла git сравнивает только его, а не все дерево коммита
+        pathspec = (f":(literal){file_path}",) if file_path else ()
+        try:
+            output = self.repo.git.diff_tree('-z', '--numstat', '-r', '--no-commit-id', '--root',
+                                             '--diff-merges=first-parent', '--end-of-options', rev, '--', *pathspec)
+        except GitCommandError:
+            raise ValueError(f"Коммит {rev} не найден")
+
+        files = {}
+        total = {'insertions': 0, 'deletions': 0, 'lines': 0, 'files': 0}
+        for record in output.split('\x00'):
+            if not record:
+                continue
+            insertions, deletions, path = record.split('\t', 2)
+            # Для бинарных файлов git выводит '-' вместо количества строк
+            insertions = int(insertions) if insertions != '-' else 0
+            deletions = int(deletions) if deletions != '-' else 0
+            files[path] = {'insertions': insertions, 'deletions': deletions, 'lines': insertions + deletions}
+            total['insertions'] += insertions
+            total['deletions'] += deletions
+            total['lines'] += insertions + deletions
+            total['files'] += 1
+        return files, total
+
+    def rg_files(self, query: str, exclude_extensions: Sequence[str] = ()) -> Optional[List[str]]:
+        """Список файлов, содержащих строку, через ripgrep; None, если rg недоступен"""
+        if RG_PATH is None:
+            return None
+        args = [RG_PATH, '--files-with-matches', '--null', '--ignore-case', '--fixed-strings']
+        for ext in exclude_extensions:
+            args += ['--iglob', f"!*{ext}"]
+        args += ['--', query]
+        try:
+            result = subprocess.run(args, cwd=self.working_dir, capture_output=True)
+        except OSError:
+            return None
+        if result.returncode == 1:  # rg не нашел совпадений
+            return []
+        if result.returncode != 0:
+            return None
+        return [os.fsdecode(path) for path in result.stdout.split(b'\x00') if path]
+
+    def grep_files(self, query: str, exclude_extensions: Sequence[str] = ()) -> List[str]:
+        """Список отслеживаемых текстовых файлов, содержащих строку (без учета регистра)"""
+        if query.isascii():
+            pattern_args = ('-i', '-F', '-e', query)
         else:
-            commit = self.repo.head.commit
-        return commit.stats.files
+            # Без UTF-8 локали git grep -i не учитывает регистр не-ASCII символов
+            pattern_args = ('-E', '-e', _case_insensitive_ere(query))
+        # Исключенные расширения git даже не открывает
+        pathspecs = [f":(exclude,icase)*{ext}" for ext in exclude_extensions]
+        output = self.repo.git.grep('-l', '-I', '--null', *pattern_args, '--', *pathspecs)
+        return [path for path in output.split('\x00') if path]
 
     def get_files(self) -> List[str]:
-        """Получает список всех файлов в репозитории"""
-        return self.repo.git.ls_files().splitlines() 
\ No newline at end of file
+        """Получает список всех файлов в репозитории (общий список, изменять его нельзя)"""
+        # git ls-files читает индекс, поэтому список действителен, пока не изменился файл индекса
+        index_key = self._index_key()
+        if self._files is None or self._files[0] != index_key:
+            files = [path for path in self.repo.git.ls_files('-z').split('\x00') if path]
+            self._files = (index_key, files)
+        return self._files[1]
+
+    def _index_key(self) -> Optional[Tuple[int, int]]:
+        """Состояние файла индекса (mtime_ns, размер) для проверки актуальности прочитанных из него данных"""
+        try:
+            index_stat = os.stat(os.path.join(self.repo.git_dir, 'index'))
+        except OSError:
+            return None
+        return (index_stat.st_mtime_ns, index_stat.st_size)
+
+    def get_index_shas(self) -> Dict[str, str]:
+        """SHA blob-объектов обычных файлов в индексе (общий словарь, изменять его нельзя)"""
+        index_key = self._index_key()
+        if self._index_shas is None or self._index_shas[0] != index_key:
+            shas = {}
+            # Строки вида "<режим> <SHA> <стадия>\t<путь>"; ссылки, подмодули и
+            # неразрешенные конфликты пропускаются: их SHA не описывает содержимое файла
+            for entry in self.repo.git.ls_files('-s', '-z').split('\x00'):
+                info, _, path = entry.partition('\t')
+                if path:
+                    mode, sha, stage = info.split()
+                    if stage == '0' and mode in ('100644', '100755'):
+                        shas[path] = sha
+            self._index_shas = (index_key, shas)
+        return self._index_shas[1]
+
+    def get_worktree_changes(self) -> Set[str]:
+        """Отслеживаемые файлы, которые в рабочей копии изменены или удалены относительно индекса"""
+        # git сверяет файлы с индексом по stat и перечитывает только подозрительные
+        return set(filter(None, self.repo.git.ls_files('-m', '-z').split('\x00')))
+
+    def get_file_types(self) -> Counter:
+        """Количество файлов по расширениям ('без расширения' для файлов без него)"""
+        files = self.get_files()
+        if self._file_types is None or self._file_types[0] is not files:
+            # Сначала считаем сырые расширения, затем приводим к нижнему регистру
+            # только уникальные значения, а не каждый путь
+            file_types = Counter()
+            for ext, count in Counter(map(_raw_extension, files)).items():
+                file_types[f".{ext.lower()}" if ext is not None else 'без расширения'] += count
+            self._file_types = (files, file_types)
+        return Counter(self._file_types[1])
@@ -2,9 +2,24 @@ import os
 import json
 from typing import Dict, Any
 
+try:
+    import orjson
+except ImportError:  # orjson необязателен: без него используется стандартный json
+    orjson = None
+
+SETTINGS_FILE = os.path.join(os.path.expanduser("~"), ".gitwizard_settings.json")
+
+def _loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def _dumps(obj: Any) -> bytes:
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
 class Settings:
     def __init__(self):
-        self.settings_file = os.path.join(os.path.expanduser("~"), ".gitwizard_settings.json")
+        self.settings_file = SETTINGS_FILE
         self.settings = self.load_settings()
 
     def load_settings(self) -> Dict[str, Any]:
@@ -18,6 +33,7 @@ class Settings:
             'color_output': True,
             'default_branch': 'main',
             'editor': os.environ.get('EDITOR', 'vim'),
+            'max_file_kb': 1024,
             'ide_integration': {
                 'vscode': False,
                 'pycharm': False,
@@ -26,11 +42,13 @@ class Settings:
         }
         
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    user_settings = json.load(f)
-                    # Обновляем дефолтные настройки пользовательскими
-                    default_settings.update(user_settings)
+            with open(self.settings_file, 'rb') as f:
+                user_settings = _loads(f.read())
+                # Обновляем дефолтные настройки пользовательскими
+                default_settings.update(user_settings)
+        except FileNotFoundError:
+            # Файла еще нет - используются настройки по умолчанию
+            pass
         except Exception as e:
             print(f"Не удалось загрузить настройки: {str(e)}")
         
@@ -39,8 +57,8 @@ class Settings:
     def save_settings(self) -> bool:
         """Сохранение настроек пользователя"""
         try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=2)
+            with open(self.settings_file, 'wb') as f:
+                f.write(_dumps(self.settings))
             return True
         except Exception as e:
             print(f"Ошибка при сохранении настроек: {str(e)}")
@@ -1,56 +1,71 @@
-from typing import Dict, Any
-from prompt_toolkit.styles import Style
+from functools import cache
+from typing import Dict, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from prompt_toolkit.styles import Style
+
+# Цветовые темы: статические данные, общие для всех экземпляров
+THEMES = {
+    'light': {
+        'background': 'white',
+        'foreground': 'black',
+        'accent': 'blue',
+        'success': 'green',
+        'warning': 'yellow',
+        'error': 'red'
+    },
+    'dark': {
+        'background': 'black',
+        'foreground': 'white',
+        'accent': 'cyan',
+        'success': 'green',
+        'warning': 'yellow',
+        'error': 'red'
+    },
+    'monokai': {
+        'background': '#272822',
+        'foreground': '#f8f8f2',
+        'accent': '#a6e22e',
+        'success': '#66d9ef',
+        'warning': '#fd971f',
+        'error': '#f92672'
+    },
+    'solarized': {
+        'background': '#002b36',
+        'foreground': '#93a1a1',
+        'accent': '#268bd2',
+        'success': '#859900',
+        'warning': '#b58900',
+        'error': '#dc322f'
+    }
+}
+
+@cache
+def _build_style(theme_name: str) -> 'Style':
+    """Стиль prompt_toolkit строится один раз для каждой темы"""
+    from prompt_toolkit.styles import Style
+
+    theme = THEMES[theme_name]
+    return Style.from_dict({
+        'prompt': f"{theme['accent']} bold",
+        'background': theme['background'],
+        'foreground': theme['foreground']
+    })
 
 class Theme:
     def __init__(self):
-        self.themes = {
-            'light': {
-                'background': 'white',
-                'foreground': 'black',
-                'accent': 'blue',
-                'success': 'green',
-                'warning': 'yellow',
-                'error': 'red'
-            },
-            'dark': {
-                'background': 'black',
-                'foreground': 'white',
-                'accent': 'cyan',
-                'success': 'green',
-                'warning': 'yellow',
-                'error': 'red'
-            },
-            'monokai': {
-                'background': '#272822',
-                'foreground': '#f8f8f2',
-                'accent': '#a6e22e',
-                'success': '#66d9ef',
-                'warning': '#fd971f',
-                'error': '#f92672'
-            },
-            'solarized': {
-                'background': '#002b36',
-                'foreground': '#93a1a1',
-                'accent': '#268bd2',
-                'success': '#859900',
-                'warning': '#b58900',
-                'error': '#dc322f'
-            }
-        }
+        self.themes = THEMES
         self.current_theme = 'dark'
+        # Цвета текущей темы: get_color вызывается при каждом выводе в консоль
+        self._colors = self.themes[self.current_theme]
 
     def get_theme(self, theme_name: str) -> Dict[str, str]:
         """Получение темы по имени"""
         return self.themes.get(theme_name, self.themes['dark'])
 
-    def get_style(self, theme_name: str) -> Style:
+    def get_style(self, theme_name: str) -> 'Style':
         """Получение стиля для prompt_toolkit"""
-        theme = self.get_theme(theme_name)
-        return Style.from_dict({
-            'prompt': f"{theme['accent']} bold",
-            'background': theme['background'],
-            'foreground': theme['foreground']
-        })
+        return _build_style(theme_name if theme_name in self.themes else 'dark')
 
     def get_available_themes(self) -> list:
         """Получение списка доступных тем"""
@@ -60,6 +75,7 @@ class Theme:
         """Установка текущей темы"""
         if theme_name in self.themes:
             self.current_theme = theme_name
+            self._colors = self.themes[theme_name]
             return True
         return False
 
@@ -69,5 +85,5 @@ class Theme:
 
     def get_color(self, color_type: str) -> str:
         """Получение цвета по типу для текущей темы"""
-        theme = self.get_theme(self.current_theme)
-        return theme.get(color_type, theme['foreground']) 
\ No newline at end of file
+        colors = self._colors
+        return colors.get(color_type, colors['foreground']) 
\ No newline at end of file
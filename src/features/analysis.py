@@ -1,176 +1,492 @@
-from typing import List, Dict, Optional, Tuple, Any
+from typing import Callable, Iterator, List, Dict, Optional, Set, Tuple, Any
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, chain
+import hashlib
+import mmap
+import os
 import re
+import sys
 from datetime import datetime
 
-class CodeAnalyzer:
-    def __init__(self, repository):
-        self.repository = repository
+# Шаблоны потенциальных уязвимостей в порядке проверки
+SECURITY_PATTERN_SOURCES = {
+    'SQL Injection': [
+        r'SELECT.*FROM.*WHERE.*=.*[\'"]\s*\+\s*[\'"]',
+        r'INSERT.*INTO.*VALUES.*[\'"]\s*\+\s*[\'"]',
+        r'UPDATE.*SET.*=.*[\'"]\s*\+\s*[\'"]',
+        r'DELETE.*FROM.*WHERE.*=.*[\'"]\s*\+\s*[\'"]'
+    ],
+    'Command Injection': [
+        r'os\.system\(',
+        r'subprocess\.call\(',
+        r'exec\(',
+        r'eval\('
+    ],
+    'Path Traversal': [
+        r'\.\./',
+        r'\.\.\\',
+        r'%2e%2e%2f',
+        r'%252e%252e%252f'
+    ],
+    'Hardcoded Credentials': [
+        r'password\s*=\s*[\'"][^\'"]+[\'"]',
+        r'api_key\s*=\s*[\'"][^\'"]+[\'"]',
+        r'secret\s*=\s*[\'"][^\'"]+[\'"]'
+    ]
+}
+SECURITY_PATTERNS = [
+    (issue_type, re.compile(pattern))
+    for issue_type, patterns in SECURITY_PATTERN_SOURCES.items()
+    for pattern in patterns
+]
+SECURITY_RE = re.compile('|'.join(f"(?:{pattern.pattern})" for _, pattern in SECURITY_PATTERNS))
 
-    def analyze_complexity(self, file_path: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Анализ сложности кода"""
-        results = []
-        files = [file_path] if file_path else self._get_code_files()
+# Расширения файлов с кодом; str.endswith с кортежем проверяет их в C быстрее поиска по множеству
+CODE_EXTENSIONS = ('.py', '.js', '.java', '.cpp', '.c', '.h')
 
-        for file in files:
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    lines = content.split('\n')
-                    
-                    # Подсчет строк кода
-                    code_lines = len([l for l in lines if l.strip() and not l.strip().startswith(('#', '//', '/*', '*', '*/'))])
-                    
-                    # Подсчет функций
-                    functions = 0
-                    complexity = 0
-                    
-                    for line in lines:
-                        # Подсчет функций
-                        if any(line.strip().startswith(keyword) for keyword in ['def ', 'function ', 'public ', 'private ', 'protected ']):
-                            functions += 1
-                        
-                        # Подсчет сложности
-                        if any(keyword in line for keyword in ['if ', 'for ', 'while ', 'switch ', 'case ', 'catch ', '&&', '||']):
-                            complexity += 1
-                    
-                    results.append({
-                        'file': file,
-                        'code_lines': code_lines,
-                        'functions': functions,
-                        'complexity': complexity
-                    })
-            except Exception as e:
-                print(f"Ошибка при анализе файла {file}: {str(e)}")
+# Классификация строк при подсчете метрик
+COMMENT_PREFIXES = ('#', '//', '/*', '*', '*/')
+FUNCTION_PREFIXES = ('def ', 'function ', 'public ', 'private ', 'protected ')
+LOOP_PREFIXES = ('for ', 'while ')
+DEF_PREFIXES = ('def ', 'async def ')
+# Вызов самой функции: по имени или через self/cls, но не одноименный метод другого объекта
+SELF_CALL_TEMPLATE = r'(?:^|[^\w.]|\b(?:self|cls)\.){}\('
+NESTING_PREFIXES = ('if ', 'for ', 'while ', 'def ', 'class ')
+CONTINUATION_PREFIXES = ('else:', 'elif ')
+# Ключевые слова ветвлений ищутся как подстроки в любом месте строки
+COMPLEXITY_RE = re.compile(r'if |for |while |switch |case |catch |&&|\|\|')
 
-        return results
+# Импорты Python: import a, b.c as d / from a.b import c
+IMPORT_RE = re.compile(r'^[ \t]*(?:import[ \t]+([\w. \t,]+)|from[ \t]+([\w.]+)[ \t]+import\b)', re.M)
 
-    def find_duplicates(self, min_length: int = 5) -> List[Dict[str, Any]]:
-        """Поиск дубликатов кода"""
-        results = []
-        files = self._get_code_files()
-        code_fragments = defaultdict(list)
+# Модули стандартной библиотеки не являются внешними зависимостями
+try:
+    STDLIB_MODULES = frozenset(sys.stdlib_module_names)
+except AttributeError:  # Python < 3.10: модули из каталогов стандартной библиотеки
+    import pkgutil
+    import sysconfig
+
+    _stdlib_dir = sysconfig.get_paths()['stdlib']
+    STDLIB_MODULES = frozenset(chain(
+        sys.builtin_module_names,
+        (module.name for module in pkgutil.iter_modules([_stdlib_dir, os.path.join(_stdlib_dir, 'lib-dynload')])),
+    ))
+
+# Файлы крупнее порога отображаются в память вместо чтения в промежуточный буфер
+MMAP_MIN_BYTES = 256 * 1024
+# Файлы крупнее порога по умолчанию не анализируются, КБ
+MAX_FILE_KB = 1024
+# Файл считается двоичным, если в его начале есть нулевой байт
+BINARY_SNIFF_BYTES = 4096
+# Отметка двоичного файла вместо (mtime_ns, размер)
+BINARY = object()
+
+def _is_binary(file: str) -> bool:
+    """Двоичный ли файл: проверяется только его начало"""
+    try:
+        with open(file, 'rb') as f:
+            return b'\0' in f.read(BINARY_SNIFF_BYTES)
+    except OSError:
+        return False
+
+def _read_source(file: str) -> str:
+    """Текст файла с кодом с приведенными к \\n переводами строк"""
+    # Байты не в UTF-8 заменяются, а не прерывают разбор файла
+    with open(file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                content = str(mm, 'utf-8', 'replace')
+        else:
+            content = f.read().decode('utf-8', 'replace')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+# Небольшие объемы кода разбираем в текущем процессе: запуск пула обойдется дороже
+PARALLEL_MIN_BYTES = 1024 * 1024
+
+# Версия результатов в кэше анализа на диске: увеличивается при изменении метрик
+ANALYSIS_CACHE_VERSION = 1
+
+def _blob_sha(file: str) -> Optional[str]:
+    """SHA-1 содержимого файла в том виде, в каком его считает git для blob-объекта
+    (для файлов, которых нет в индексе или которые изменены относительно него)"""
+    try:
+        with open(file, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    sha = hashlib.sha1(b'blob %d\0' % len(data))
+    sha.update(data)
+    return sha.hexdigest()
+
+def _complexity_metrics(file: str, lines: List[str]) -> Dict[str, Any]:
+    """Сложность файла по его строкам"""
+    code_lines = 0
+    functions = 0
+    complexity = 0
+    
+    for line in lines:
+        stripped = line.strip()
+        # Подсчет строк кода
+        if stripped and not stripped.startswith(COMMENT_PREFIXES):
+            code_lines += 1
         
-        for file in files:
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    lines = content.split('\n')
-                    
-                    for i in range(len(lines) - min_length + 1):
-                        fragment = '\n'.join(lines[i:i + min_length])
-                        if fragment.strip():
-                            code_fragments[fragment].append((file, i + 1))
-            except Exception as e:
-                print(f"Ошибка при чтении файла {file}: {str(e)}")
+        # Подсчет функций
+        if stripped.startswith(FUNCTION_PREFIXES):
+            functions += 1
+        
+        # Подсчет сложности
+        if COMPLEXITY_RE.search(line):
+            complexity += 1
+    
+    return {
+        'file': file,
+        'code_lines': code_lines,
+        'functions': functions,
+        'complexity': complexity
+    }
 
-        for fragment, occurrences in code_fragments.items():
-            if len(occurrences) > 1:
+def _security_issues(file: str, content: str, lines: List[str]) -> List[Dict[str, Any]]:
+    """Потенциальные уязвимости по тексту файла"""
+    results = []
+    # Общее выражение находит строки-кандидаты за один проход по файлу,
+    # отдельные шаблоны проверяются только на них
+    line_index = 0
+    counted_to = 0
+    position = 0
+    while match := SECURITY_RE.search(content, position):
+        line_index += content.count('\n', counted_to, match.start())
+        counted_to = match.start()
+        line = lines[line_index]
+        for issue_type, pattern in SECURITY_PATTERNS:
+            if pattern.search(line):
                 results.append({
-                    'fragment': fragment,
-                    'occurrences': occurrences
+                    'file': file,
+                    'line': line_index + 1,
+                    'issue_type': issue_type,
+                    'code': line.strip()
                 })
+        # Следующий поиск - со следующей строки, чтобы не пропустить ни одну
+        line_end = content.find('\n', match.start())
+        if line_end == -1:
+            break
+        position = line_end + 1
+    return results
 
-        return results
+def _performance_metrics(file: str, content: str, lines: List[str]) -> Dict[str, Any]:
+    """Показатели производительности по тексту файла"""
+    # Рекурсивные функции, циклы и вложенность считаются за один проход по строкам.
+    # Вложенность определяется стеком отступов открытых блоков, рекурсия - стеком
+    # открытых определений: вызов функции ищется только в ее собственном теле
+    recursion = 0
+    loops = 0
+    max_nesting = 0
+    open_blocks = []  # отступы открытых блоков
+    open_functions = []  # [отступ def, шаблон вызова, найден ли вызов]
+    for line in lines:
+        stripped = line.lstrip()
+        if not stripped:
+            continue
+        indent = len(line) - len(stripped)
+        while open_blocks and indent <= open_blocks[-1]:
+            open_blocks.pop()
+        while open_functions and indent <= open_functions[-1][0]:
+            open_functions.pop()
 
-    def analyze_security(self, file_path: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Анализ безопасности кода"""
-        results = []
-        files = [file_path] if file_path else self._get_code_files()
+        if stripped.startswith(LOOP_PREFIXES):
+            loops += 1
+        if stripped.startswith(NESTING_PREFIXES):
+            open_blocks.append(indent)
+            max_nesting = max(max_nesting, len(open_blocks))
+        elif stripped.startswith(CONTINUATION_PREFIXES):
+            # else/elif продолжают блок на том же уровне
+            open_blocks.append(indent)
+
+        if stripped.startswith(DEF_PREFIXES):
+            func_name = stripped.partition('def ')[2].split('(')[0].strip()
+            open_functions.append([indent, re.compile(SELF_CALL_TEMPLATE.format(re.escape(func_name))), False])
+            continue
+        for function in open_functions:
+            if not function[2] and function[1].search(line):
+                function[2] = True
+                recursion += 1
+    
+    return {
+        'file': file,
+        'loops': loops,
+        'recursion': recursion,
+        'max_nesting': max_nesting
+    }
+
+def _analyze_file_complexity(file: str) -> Optional[Dict[str, Any]]:
+    """Сложность одного файла"""
+    try:
+        return _complexity_metrics(file, _read_source(file).split('\n'))
+    except Exception as e:
+        print(f"Ошибка при анализе файла {file}: {str(e)}")
+        return None
+
+def _analyze_file_security(file: str) -> List[Dict[str, Any]]:
+    """Потенциальные уязвимости в одном файле"""
+    try:
+        content = _read_source(file)
+        return _security_issues(file, content, content.split('\n'))
+    except Exception as e:
+        print(f"Ошибка при анализе файла {file}: {str(e)}")
+        return []
 
-        security_patterns = {
-            'SQL Injection': [
-                r'SELECT.*FROM.*WHERE.*=.*[\'"]\s*\+\s*[\'"]',
-                r'INSERT.*INTO.*VALUES.*[\'"]\s*\+\s*[\'"]',
-                r'UPDATE.*SET.*=.*[\'"]\s*\+\s*[\'"]',
-                r'DELETE.*FROM.*WHERE.*=.*[\'"]\s*\+\s*[\'"]'
-            ],
-            'Command Injection': [
-                r'os\.system\(',
-                r'subprocess\.call\(',
-                r'exec\(',
-                r'eval\('
-            ],
-            'Path Traversal': [
-                r'\.\./',
-                r'\.\.\\',
-                r'%2e%2e%2f',
-                r'%252e%252e%252f'
-            ],
-            'Hardcoded Credentials': [
-                r'password\s*=\s*[\'"][^\'"]+[\'"]',
-                r'api_key\s*=\s*[\'"][^\'"]+[\'"]',
-                r'secret\s*=\s*[\'"][^\'"]+[\'"]'
-            ]
-        }
+def _analyze_file_performance(file: str) -> Optional[Dict[str, Any]]:
+    """Показатели производительности одного файла"""
+    try:
+        content = _read_source(file)
+        return _performance_metrics(file, content, content.split('\n'))
+    except Exception as e:
+        print(f"Ошибка при анализе файла {file}: {str(e)}")
+        return None
 
+def _analyze_file(file: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Сложность, уязвимости и производительность одного файла за одно чтение"""
+    try:
+        content = _read_source(file)
+        lines = content.split('\n')
+        return (
+            _complexity_metrics(file, lines),
+            _security_issues(file, content, lines),
+            _performance_metrics(file, content, lines)
+        )
+    except Exception as e:
+        print(f"Ошибка при анализе файла {file}: {str(e)}")
+        return None, [], None
+
+def _scan_file_imports(file: str) -> List[str]:
+    """Пакеты верхнего уровня, импортируемые в одном файле Python"""
+    modules = set()
+    try:
+        content = _read_source(file)
+        # Одно выражение со флагом MULTILINE проходит весь файл без цикла по строкам
+        for names, source in IMPORT_RE.findall(content):
+            for name in (source,) if source else names.split(','):
+                name = name.strip()
+                # Относительные импорты - части самого проекта
+                if name and not name.startswith('.'):
+                    modules.add(name.split()[0].split('.')[0])
+    except Exception as e:
+        print(f"Ошибка при анализе файла {file}: {str(e)}")
+    return sorted(modules)
+
+def _project_modules(files: List[str]) -> Set[str]:
+    """Имена модулей верхнего уровня самого проекта: из корня репозитория и каталогов-корней исходников (src/ и т.п.)"""
+    packages = {os.path.dirname(file) for file in files if os.path.basename(file) == '__init__.py'}
+    modules = set()
+    for file in files:
+        if not file.endswith('.py'):
+            continue
+        parts = file[:-len('.py')].split('/')
+        modules.add(parts[0])
+        # Каталог первого уровня без __init__.py - корень исходников, а не пакет
+        if len(parts) > 1 and parts[0] not in packages:
+            modules.add(parts[1])
+    return modules
+
+def _map_files(func: Callable[[str], Any], files: List[str]) -> Iterator[Any]:
+    """Применение функции к файлам по порядку; на больших объемах - параллельно в пуле процессов"""
+    workers = os.cpu_count() or 1
+    total_size = 0
+    for file in files:
+        try:
+            total_size += os.stat(file).st_size
+        except OSError:
+            pass
+        if total_size >= PARALLEL_MIN_BYTES:
+            break
+    if workers < 2 or len(files) < 2 or total_size < PARALLEL_MIN_BYTES:
+        yield from map(func, files)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            yield from executor.map(func, files, chunksize=max(1, len(files) // (workers * 4)))
+        finally:
+            # При прерывании не дожидаемся файлов, которые уже не нужны
+            executor.shutdown(cancel_futures=True)
+
+class CodeAnalyzer:
+    def __init__(self, repository, max_file_kb: int = MAX_FILE_KB):
+        self.repository = repository
+        # Файлы крупнее порога (обычно сгенерированные) не анализируются
+        self.max_file_bytes = max_file_kb * 1024
+        # Результаты разбора файлов за сессию: (функция, путь) -> ((mtime_ns, размер), результат)
+        self._file_results: Dict[Tuple[str, str], Tuple[Tuple[int, int], Any]] = {}
+        # Файлы с кодом и список отслеживаемых файлов, из которого они отобраны
+        self._code_files: Optional[Tuple[List[str], List[str]]] = None
+        # Результаты прошлых сессий: "функция:путь" -> [SHA содержимого, результат]
+        self._stored_results: Optional[Dict[str, Any]] = None
+
+    def _map_cached(self, func: Callable[[str], Any], files: List[str], limit_size: bool = True) -> Iterator[Tuple[str, Any]]:
+        """Пары (файл, результат) с повторным использованием результатов для неизмененных файлов;
+        двоичные и (при limit_size) слишком большие файлы пропускаются"""
+        stamps = {}
         for file in files:
             try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    lines = content.split('\n')
-                    
-                    for i, line in enumerate(lines, 1):
-                        for issue_type, patterns in security_patterns.items():
-                            for pattern in patterns:
-                                if re.search(pattern, line):
-                                    results.append({
-                                        'file': file,
-                                        'line': i,
-                                        'issue_type': issue_type,
-                                        'code': line.strip()
-                                    })
-            except Exception as e:
-                print(f"Ошибка при анализе файла {file}: {str(e)}")
+                stat = os.stat(file)
+            except OSError:
+                stamps[file] = None
+                continue
+            if not limit_size or stat.st_size <= self.max_file_bytes:
+                stamps[file] = (stat.st_mtime_ns, stat.st_size)
+        
+        # Двоичные файлы не попадают в кэш, поэтому проверяются только файлы без готового результата
+        missing = []
+        for file, stamp in stamps.items():
+            if stamp is None or self._file_results.get((func.__name__, file), (None,))[0] != stamp:
+                if _is_binary(file):
+                    stamps[file] = BINARY
+                else:
+                    missing.append(file)
+        computed = self._map_stored(func, missing)
+        
+        for file, stamp in stamps.items():
+            if stamp is BINARY:
+                continue
+            key = (func.__name__, file)
+            entry = self._file_results.get(key)
+            if entry is not None and stamp is not None and entry[0] == stamp:
+                yield file, entry[1]
+                continue
+            result = next(computed)
+            if stamp is not None:
+                self._file_results[key] = (stamp, result)
+            yield file, result
 
-        return results
+    def _map_stored(self, func: Callable[[str], Any], files: List[str]) -> Iterator[Any]:
+        """Результаты для файлов по порядку: из кэша на диске по SHA содержимого, остальные - разбором"""
+        if not files:
+            return
+        if self._stored_results is None:
+            self._stored_results = self.repository.commit_cache.get_analysis(ANALYSIS_CACHE_VERSION)
+        
+        # SHA неизмененных файлов уже есть в индексе git; читаются и хешируются только остальные
+        index_shas = self.repository.get_index_shas()
+        worktree_changes = self.repository.get_worktree_changes()
+        blob_shas = [
+            index_shas[file] if file in index_shas and file not in worktree_changes else _blob_sha(file)
+            for file in files
+        ]
+        stored = [self._stored_results.get(f"{func.__name__}:{file}") for file in files]
+        changed = [
+            file for file, blob_sha, entry in zip(files, blob_shas, stored)
+            if blob_sha is None or not entry or entry[0] != blob_sha
+        ]
+        fresh = _map_files(func, changed)
+        
+        computed_any = False
+        try:
+            for file, blob_sha, entry in zip(files, blob_shas, stored):
+                if blob_sha is not None and entry and entry[0] == blob_sha:
+                    yield entry[1]
+                    continue
+                result = next(fresh)
+                if blob_sha is not None:
+                    self._stored_results[f"{func.__name__}:{file}"] = [blob_sha, result]
+                    computed_any = True
+                yield result
+        finally:
+            # Сохраняем и то, что успели разобрать до прерывания
+            fresh.close()
+            if computed_any:
+                self.repository.commit_cache.put_analysis(ANALYSIS_CACHE_VERSION, self._stored_results)
 
-    def analyze_performance(self, file_path: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Анализ производительности кода"""
-        results = []
+    def analyze_complexity(self, file_path: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Анализ сложности кода; результаты выдаются по мере разбора файлов"""
         files = [file_path] if file_path else self._get_code_files()
+        return (result for _, result in self._map_cached(_analyze_file_complexity, files, limit_size=not file_path) if result)
 
-        for file in files:
+    def find_duplicates(self, min_length: int = 5) -> Iterator[Dict[str, Any]]:
+        """Поиск дубликатов кода"""
+        files = self._get_code_files()
+        # Окна строк хранятся в виде 64-битных отпечатков, текст - только у повторяющихся фрагментов.
+        # Большинство окон встречается один раз: для них хранится только позиция, упакованная в число
+        # (номер файла << 32 | строка), а список вхождений заводится со второго появления
+        first_seen: Dict[int, int] = {}
+        code_fragments: Dict[int, List[Tuple[str, int]]] = {}
+        fragment_texts = {}
+        
+        for file_index, file in enumerate(files):
             try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    lines = content.split('\n')
-                    
-                    # Подсчет циклов
-                    loops = 0
-                    for line in lines:
-                        if any(line.strip().startswith(keyword) for keyword in ['for ', 'while ']):
-                            loops += 1
-                    
-                    # Подсчет рекурсивных вызовов
-                    recursion = 0
-                    for line in lines:
-                        if 'def ' in line:
-                            func_name = line.split('def ')[1].split('(')[0].strip()
-                            if func_name in content:
-                                recursion += 1
-                    
-                    # Подсчет максимальной вложенности
-                    max_nesting = 0
-                    current_nesting = 0
-                    for line in lines:
-                        if line.strip().startswith(('if ', 'for ', 'while ', 'def ', 'class ')):
-                            current_nesting += 1
-                            max_nesting = max(max_nesting, current_nesting)
-                        elif line.strip() and not line.strip().startswith(('else:', 'elif ')):
-                            current_nesting = 0
-                    
-                    results.append({
-                        'file': file,
-                        'loops': loops,
-                        'recursion': recursion,
-                        'max_nesting': max_nesting
-                    })
+                if os.stat(file).st_size > self.max_file_bytes or _is_binary(file):
+                    continue
+                content = _read_source(file)
+                lines = content.split('\n')
+                line_hashes = list(map(hash, lines))
+                # Число непустых строк до каждой позиции: пустое окно определяется за O(1)
+                non_blank = list(accumulate((1 if line.strip() else 0 for line in lines), initial=0))
+                
+                # Кортежи окон собираются zip по сдвинутым спискам хешей без цикла в байткоде
+                windows = zip(*(line_hashes[offset:] for offset in range(min_length)))
+                file_position = file_index << 32
+                for i, fingerprint in enumerate(map(hash, windows)):
+                    if non_blank[i + min_length] == non_blank[i]:
+                        continue
+                    if fingerprint not in first_seen:
+                        first_seen[fingerprint] = file_position | (i + 1)
+                        continue
+                    occurrences = code_fragments.get(fingerprint)
+                    if occurrences is None:
+                        first = first_seen[fingerprint]
+                        occurrences = code_fragments[fingerprint] = [(files[first >> 32], first & 0xFFFFFFFF)]
+                        fragment_texts[fingerprint] = '\n'.join(lines[i:i + min_length])
+                    occurrences.append((file, i + 1))
             except Exception as e:
-                print(f"Ошибка при анализе файла {file}: {str(e)}")
+                print(f"Ошибка при чтении файла {file}: {str(e)}")
+
+        # Вхождения фрагмента известны только после просмотра всех файлов,
+        # но список результатов целиком не собирается; порядок - по первому вхождению
+        for fingerprint in sorted(code_fragments, key=first_seen.__getitem__):
+            yield {
+                'fragment': fragment_texts[fingerprint],
+                'occurrences': code_fragments[fingerprint]
+            }
+
+    def analyze_security(self, file_path: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Анализ безопасности кода; результаты выдаются по мере разбора файлов"""
+        files = [file_path] if file_path else self._get_code_files()
+        return chain.from_iterable(issues for _, issues in self._map_cached(_analyze_file_security, files, limit_size=not file_path))
+
+    def analyze_performance(self, file_path: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Анализ производительности кода; результаты выдаются по мере разбора файлов"""
+        files = [file_path] if file_path else self._get_code_files()
+        return (result for _, result in self._map_cached(_analyze_file_performance, files, limit_size=not file_path) if result)
+
+    def analyze_all(self, file_path: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Сложность, безопасность и производительность кода за один проход по файлам"""
+        files = [file_path] if file_path else self._get_code_files()
+        report = {'complexity': [], 'security': [], 'performance': []}
+        for _, (complexity, issues, performance) in self._map_cached(_analyze_file, files, limit_size=not file_path):
+            if complexity:
+                report['complexity'].append(complexity)
+            report['security'].extend(issues)
+            if performance:
+                report['performance'].append(performance)
+        return report
 
-        return results
+    def analyze_dependencies(self) -> Dict[str, List[str]]:
+        """Внешние пакеты, импортируемые в файлах Python: пакет -> файлы"""
+        files = [f for f in self._get_code_files() if f.endswith('.py')]
+        # Стандартная библиотека и модули самого проекта отбрасываются после кэша:
+        # кэшированные списки импортов файлов от них не зависят
+        skipped = STDLIB_MODULES | _project_modules(files)
+        dependencies = defaultdict(list)
+        for file, modules in self._map_cached(_scan_file_imports, files):
+            for module in modules:
+                if module not in skipped:
+                    dependencies[module].append(file)
+        return dict(sorted(dependencies.items(), key=lambda x: len(x[1]), reverse=True))
 
     def _get_code_files(self) -> List[str]:
         """Получение списка файлов с кодом"""
-        return [f for f in self.repository.get_files() if f.endswith(('.py', '.js', '.java', '.cpp', '.c', '.h'))] 
\ No newline at end of file
+        files = self.repository.get_files()
+        # get_files возвращает один и тот же список, пока не изменился индекс git
+        if self._code_files is None or self._code_files[0] is not files:
+            self._code_files = (files, [f for f in files if f.endswith(CODE_EXTENSIONS)])
+        return self._code_files[1] 
\ No newline at end of file
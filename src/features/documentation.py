@@ -1,67 +1,17 @@
 from typing import Dict, Any, List
 import os
 import json
+import time
 import yaml
-from datetime import datetime
+from core.dates import format_timestamp
 
-class DocumentationGenerator:
-    def __init__(self, repository):
-        self.repository = repository
+try:
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:  # PyYAML собран без libyaml: используется эмиттер на Python
+    from yaml import SafeDumper as YamlDumper
 
-    def generate_markdown(self) -> str:
-        """Генерация документации в формате Markdown"""
-        content = []
-        
-        # Заголовок
-        content.append("# Документация проекта\n")
-        
-        # Информация о репозитории
-        content.append("## Информация о репозитории\n")
-        content.append(f"- **Название**: {os.path.basename(self.repository.working_dir)}")
-        content.append(f"- **Последнее обновление**: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
-        
-        # Статистика
-        content.append("## Статистика\n")
-        commits = self.repository.get_commits()
-        files = self.repository.get_files()
-        content.append(f"- **Количество коммитов**: {len(commits)}")
-        content.append(f"- **Количество файлов**: {len(files)}")
-        content.append(f"- **Активная ветка**: {self.repository.active_branch}\n")
-        
-        # Авторы
-        content.append("## Авторы\n")
-        authors = {}
-        for commit in commits:
-            author = commit.author.name
-            authors[author] = authors.get(author, 0) + 1
-        
-        for author, count in sorted(authors.items(), key=lambda x: x[1], reverse=True):
-            content.append(f"- {author} ({count} коммитов)")
-        content.append("")
-        
-        # Структура проекта
-        content.append("## Структура проекта\n")
-        content.append("```")
-        for file in sorted(files):
-            content.append(file)
-        content.append("```\n")
-        
-        # Последние изменения
-        content.append("## Последние изменения\n")
-        for commit in commits[:5]:
-            content.append(f"### {commit.message.split('\n')[0]}")
-            content.append(f"- **Автор**: {commit.author.name}")
-            content.append(f"- **Дата**: {datetime.fromtimestamp(commit.committed_date).strftime('%Y-%m-%d %H:%M')}")
-            content.append(f"- **Хеш**: {commit.hexsha[:8]}\n")
-        
-        return "\n".join(content)
-
-    def generate_html(self) -> str:
-        """Генерация документации в формате HTML"""
-        content = []
-        
-        # HTML шаблон
-        content.append("""<!DOCTYPE html>
+# Начало HTML-документа со стилями: не зависит от репозитория
+HTML_HEAD = """<!DOCTYPE html>
 <html lang="ru">
 <head>
     <meta charset="UTF-8">
@@ -79,29 +29,94 @@ class DocumentationGenerator:
     </style>
 </head>
 <body>
-    <div class="container">""")
+    <div class="container">"""
+
+class DocumentationGenerator:
+    def __init__(self, repository):
+        self.repository = repository
+
+    def generate_markdown(self) -> str:
+        """Генерация документации в формате Markdown"""
+        authors = self.repository.get_author_counts()
+        files = self.repository.get_files()
+        
+        # Повторяющиеся блоки собираются join по генераторам, документ - одним шаблоном
+        author_lines = "".join(f"- {author} ({count} коммитов)\n" for author, count in authors.most_common())
+        file_lines = "".join(f"{file}\n" for file in sorted(files))
+        commit_blocks = "".join(
+            f"\n### {summary}\n"
+            f"- **Автор**: {author}\n"
+            f"- **Дата**: {format_timestamp(committed_date)}\n"
+            f"- **Хеш**: {hexsha[:8]}\n"
+            for hexsha, author, committed_date, summary in self.repository.iter_log(max_count=5)
+        )
+        
+        return f"""# Документация проекта
+
+## Информация о репозитории
+
+- **Название**: {os.path.basename(self.repository.working_dir)}
+- **Последнее обновление**: {format_timestamp(time.time())}
+
+## Статистика
+
+- **Количество коммитов**: {sum(authors.values())}
+- **Количество файлов**: {len(files)}
+- **Активная ветка**: {self.repository.active_branch}
+
+## Авторы
+
+{author_lines}
+## Структура проекта
+
+```
+{file_lines}```
+
+## Последние изменения
+{commit_blocks}"""
+
+    def generate_html(self) -> str:
+        """Генерация документации в формате HTML"""
+        authors = self.repository.get_author_counts()
+        files = self.repository.get_files()
         
-        # Заголовок
-        content.append("""        <h1>Документация проекта</h1>
+        # Повторяющиеся блоки собираются join по генераторам, документ - одним шаблоном
+        author_cards = "".join(
+            f"""
+                <div class="stat-card">
+                    <h3>{author}</h3>
+                    <p>{count} коммитов</p>
+                </div>"""
+            for author, count in authors.most_common()
+        )
+        file_lines = "".join(f"\n{file}" for file in sorted(files))
+        commit_cards = "".join(
+            f"""
+            <div class="commit">
+                <h3>{summary}</h3>
+                <p><strong>Автор:</strong> {author}</p>
+                <p><strong>Дата:</strong> {format_timestamp(committed_date)}</p>
+                <p><strong>Хеш:</strong> {hexsha[:8]}</p>
+            </div>"""
+            for hexsha, author, committed_date, summary in self.repository.iter_log(max_count=5)
+        )
+        
+        return f"""{HTML_HEAD}
+        <h1>Документация проекта</h1>
         <div class="section">
             <h2>Информация о репозитории</h2>
-            <div class="stats">""")
-        
-        content.append(f"""                <div class="stat-card">
+            <div class="stats">
+                <div class="stat-card">
                     <h3>Название</h3>
                     <p>{os.path.basename(self.repository.working_dir)}</p>
                 </div>
                 <div class="stat-card">
                     <h3>Последнее обновление</h3>
-                    <p>{datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
-                </div>""")
-        
-        # Статистика
-        commits = self.repository.get_commits()
-        files = self.repository.get_files()
-        content.append(f"""                <div class="stat-card">
+                    <p>{format_timestamp(time.time())}</p>
+                </div>
+                <div class="stat-card">
                     <h3>Количество коммитов</h3>
-                    <p>{len(commits)}</p>
+                    <p>{sum(authors.values())}</p>
                 </div>
                 <div class="stat-card">
                     <h3>Количество файлов</h3>
@@ -112,89 +127,46 @@ class DocumentationGenerator:
                     <p>{self.repository.active_branch}</p>
                 </div>
             </div>
-        </div>""")
-        
-        # Авторы
-        content.append("""        <div class="section">
+        </div>
+        <div class="section">
             <h2>Авторы</h2>
-            <div class="stats">""")
-        
-        authors = {}
-        for commit in commits:
-            author = commit.author.name
-            authors[author] = authors.get(author, 0) + 1
-        
-        for author, count in sorted(authors.items(), key=lambda x: x[1], reverse=True):
-            content.append(f"""                <div class="stat-card">
-                    <h3>{author}</h3>
-                    <p>{count} коммитов</p>
-                </div>""")
-        
-        content.append("""            </div>
-        </div>""")
-        
-        # Структура проекта
-        content.append("""        <div class="section">
+            <div class="stats">{author_cards}
+            </div>
+        </div>
+        <div class="section">
             <h2>Структура проекта</h2>
-            <pre>""")
-        
-        for file in sorted(files):
-            content.append(file)
-        
-        content.append("""            </pre>
-        </div>""")
-        
-        # Последние изменения
-        content.append("""        <div class="section">
-            <h2>Последние изменения</h2>""")
-        
-        for commit in commits[:5]:
-            content.append(f"""            <div class="commit">
-                <h3>{commit.message.split('\n')[0]}</h3>
-                <p><strong>Автор:</strong> {commit.author.name}</p>
-                <p><strong>Дата:</strong> {datetime.fromtimestamp(commit.committed_date).strftime('%Y-%m-%d %H:%M')}</p>
-                <p><strong>Хеш:</strong> {commit.hexsha[:8]}</p>
-            </div>""")
-        
-        content.append("""        </div>
+            <pre>{file_lines}
+            </pre>
+        </div>
+        <div class="section">
+            <h2>Последние изменения</h2>{commit_cards}
+        </div>
     </div>
 </body>
-</html>""")
-        
-        return "\n".join(content)
+</html>"""
 
     def export_stats(self, format: str = 'json') -> str:
         """Экспорт статистики в JSON или YAML"""
+        authors = self.repository.get_author_counts()
+        files = self.repository.get_files()
+        file_types = self.repository.get_file_types()
         stats = {
             'repository': {
                 'name': os.path.basename(self.repository.working_dir),
-                'active_branch': self.repository.active_branch,
-                'last_update': datetime.now().strftime('%Y-%m-%d %H:%M')
+                'active_branch': self.repository.active_branch.name,
+                'last_update': format_timestamp(time.time())
             },
             'commits': {
-                'total': len(self.repository.get_commits()),
-                'authors': {}
+                'total': sum(authors.values()),
+                'authors': dict(authors.most_common())
             },
             'files': {
-                'total': len(self.repository.get_files()),
-                'types': {}
+                'total': len(files),
+                'types': dict(file_types)
             }
         }
         
-        # Статистика по авторам
-        for commit in self.repository.get_commits():
-            author = commit.author.name
-            stats['commits']['authors'][author] = stats['commits']['authors'].get(author, 0) + 1
-        
-        # Статистика по типам файлов
-        for file in self.repository.get_files():
-            ext = os.path.splitext(file)[1].lower()
-            if ext:
-                stats['files']['types'][ext] = stats['files']['types'].get(ext, 0) + 1
-            else:
-                stats['files']['types']['без расширения'] = stats['files']['types'].get('без расширения', 0) + 1
-        
         if format.lower() == 'yaml':
-            return yaml.dump(stats, allow_unicode=True)
+            return yaml.dump(stats, Dumper=YamlDumper, allow_unicode=True)
         else:
             return json.dumps(stats, ensure_ascii=False, indent=2) 
\ No newline at end of file
@@ -0,0 +1,43 @@
+from typing import Dict, Iterable, List, Tuple
+from collections import Counter
+import heapq
+import math
+import re
+
+TOKEN_RE = re.compile(r'\w+')
+
+class CommitSearchIndex:
+    """Инвертированный индекс сообщений коммитов с ранжированием BM25 (Okapi)"""
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, messages: Iterable[str]):
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.doc_lengths: List[int] = []
+
+        for doc, message in enumerate(messages):
+            tokens = TOKEN_RE.findall(message.lower())
+            self.doc_lengths.append(len(tokens))
+            for token, frequency in Counter(tokens).items():
+                self.postings.setdefault(token, []).append((doc, frequency))
+
+        total_length = sum(self.doc_lengths)
+        self.avg_length = total_length / len(self.doc_lengths) if total_length else 1.0
+
+    def search(self, query: str, limit: int = 25) -> List[int]:
+        """Индексы наиболее релевантных сообщений, от лучшего к худшему"""
+        docs_count = len(self.doc_lengths)
+        scores: Dict[int, float] = {}
+
+        for token in set(TOKEN_RE.findall(query.lower())):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log((docs_count - len(postings) + 0.5) / (len(postings) + 0.5) + 1)
+            for doc, frequency in postings:
+                norm = self.K1 * (1 - self.B + self.B * self.doc_lengths[doc] / self.avg_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * frequency * (self.K1 + 1) / (frequency + norm)
+
+        # При равных оценках сохраняется порядок истории (сначала новые коммиты)
+        return heapq.nlargest(limit, sorted(scores), key=scores.get)
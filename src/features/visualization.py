@@ -1,14 +1,83 @@
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import Any, Callable, Hashable, List, Dict, Iterator, NamedTuple, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from git import GitCommandError
 from rich.tree import Tree
 from rich.table import Table
 import os
+import re
+import mmap
+from core.dates import format_timestamp
 from core.theme import Theme
+from features.search import CommitSearchIndex
+
+# Больше строк в графе коммитов прочитать все равно невозможно
+COMMIT_GRAPH_LIMIT = 500
+
+# Файлы, которые не имеет смысла просматривать при поиске по содержимому
+SEARCH_SKIP_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.pdf', '.zip', '.tar', '.gz',
+    '.so', '.o', '.a', '.exe', '.bin', '.class', '.pyc',
+})
+SEARCH_MAX_FILE_SIZE = 4 * 1024 * 1024
+# Как и git, считаем файл бинарным, если в его начале встречается нулевой байт
+BINARY_SNIFF_SIZE = 8000
+
+def _case_insensitive_pattern(query: str) -> bytes:
+    """Построение байтового шаблона без учета регистра (в т.ч. для не-ASCII символов)"""
+    parts = []
+    for char in query:
+        variants = {char.lower().encode('utf-8'), char.upper().encode('utf-8'), char.encode('utf-8')}
+        parts.append(b'(?:' + b'|'.join(re.escape(v) for v in sorted(variants)) + b')')
+    return b''.join(parts)
+
+# Шаблон поиска, скомпилированный один раз в каждом процессе пула
+_worker_pattern: Optional[re.Pattern] = None
+
+def _init_scan_worker(pattern: bytes) -> None:
+    global _worker_pattern
+    _worker_pattern = re.compile(pattern)
+
+def _scan_file(path: str) -> Optional[str]:
+    """Проверка файла на вхождение шаблона через mmap, без чтения в память"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        if os.fstat(fd).st_size == 0:
+            return None
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b'\x00', 0, BINARY_SNIFF_SIZE) != -1:
+                return None
+            return path if _worker_pattern.search(mm) else None
+    except (OSError, ValueError):
+        return None
+    finally:
+        os.close(fd)
+
+class CommitIndex(NamedTuple):
+    """Данные для поиска по коммитам, построенные для конкретного HEAD"""
+    head: str
+    commits: List[tuple]
+    search_index: CommitSearchIndex
 
 class Visualizer:
     def __init__(self, repository, theme: Theme):
         self.repository = repository
         self.theme = theme
+        self._commit_index: Optional[CommitIndex] = None
+        # Данные, зависящие только от HEAD: (хеш HEAD, ключ -> значение)
+        self._head_memo: Tuple[Optional[str], Dict[Hashable, Any]] = (None, {})
+
+    def _memoize_by_head(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Значение на время сессии; все сохраненные значения сбрасываются, когда HEAD сдвигается"""
+        head = self.repository.get_last_commit().hexsha
+        if self._head_memo[0] != head:
+            self._head_memo = (head, {})
+        memo = self._head_memo[1]
+        if key not in memo:
+            memo[key] = compute()
+        return memo[key]
 
     def visualize_branches(self) -> Tree:
         """Визуализация веток в виде дерева"""
@@ -28,7 +97,7 @@ class Visualizer:
         
         return tree
 
-    def visualize_commit_graph(self) -> Table:
+    def visualize_commit_graph(self, max_count: int = COMMIT_GRAPH_LIMIT) -> Table:
         """Визуализация графа коммитов"""
         table = Table(show_header=False, box=None, padding=(0, 1))
         table.add_column("Граф", style=self.theme.get_color('cyan'))
@@ -37,48 +106,51 @@ class Visualizer:
         table.add_column("Дата", style=self.theme.get_color('magenta'))
         table.add_column("Сообщение", style=self.theme.get_color('foreground'))
 
-        commits = self.repository.get_commits()
-        branch_commits = {branch: self.repository.get_commits(branch)[0].hexsha for branch in self.repository.get_branches()}
+        # Вершины веток, сгруппированные по хешу коммита
+        branch_heads = {}
+        for name, hexsha in self.repository.get_branch_heads().items():
+            branch_heads.setdefault(hexsha, []).append(name)
+        branch_color = self.theme.get_color('success')
         
-        for commit in commits:
+        # Коммиты читаются только в отображаемом количестве и один раз для каждого HEAD;
+        # метки веток вычисляются заново, так как другие ветки двигаются независимо от HEAD
+        commits = self._memoize_by_head(('commit_graph', max_count), lambda: list(self.repository.iter_log(
+            max_count=max_count, fields=('hexsha', 'author', 'committed_date', 'summary', 'parents'))))
+        for hexsha, author, committed_date, summary, parents in commits:
             # Определяем, является ли коммит частью какой-либо ветки
-            branch_names = [name for name, hexsha in branch_commits.items() if hexsha == commit.hexsha]
-            branch_marker = f"[bold {self.theme.get_color('success')}]{' '.join(branch_names)}[/{self.theme.get_color('success')}] " if branch_names else ""
+            branch_names = branch_heads.get(hexsha, [])
+            branch_marker = f"[bold {branch_color}]{' '.join(branch_names)}[/] " if branch_names else ""
             
             # Создаем визуальное представление графа
             graph_line = ""
-            if commit.parents:
-                graph_line += "│ " * (len(commit.parents) - 1)
-                graph_line += "└─" if len(commit.parents) > 1 else "│"
+            parents_count = len(parents.split())
+            if parents_count:
+                graph_line += "│ " * (parents_count - 1)
+                graph_line += "└─" if parents_count > 1 else "│"
             else:
                 graph_line += "●"
             
             table.add_row(
                 graph_line,
-                commit.hexsha[:8],
-                commit.author.name,
-                datetime.fromtimestamp(commit.committed_date).strftime('%Y-%m-%d %H:%M'),
-                f"{branch_marker}{commit.message.split('\n')[0]}"
+                hexsha[:8],
+                author,
+                format_timestamp(committed_date),
+                f"{branch_marker}{summary}"
             )
 
         return table
 
     def visualize_history(self) -> List[List[str]]:
         """Визуализация истории коммитов"""
-        commits = self.repository.get_commits()
-        history_data = []
-        for commit in commits[:10]:  # Показываем последние 10 коммитов
-            history_data.append([
-                commit.hexsha[:8],
-                commit.author.name,
-                datetime.fromtimestamp(commit.committed_date).strftime('%Y-%m-%d %H:%M'),
-                commit.message.split('\n')[0]
-            ])
-        return history_data
+        # Показываем последние 10 коммитов; для одного HEAD история не меняется
+        return list(self._memoize_by_head('history', lambda: [
+            [hexsha[:8], author, format_timestamp(committed_date), summary]
+            for hexsha, author, committed_date, summary in self.repository.iter_log(max_count=10)
+        ]))
 
     def visualize_changes(self, commit_hash: str = None, file_path: str = None) -> List[List[str]]:
         """Визуализация изменений"""
-        stats = self.repository.get_file_stats(commit_hash)
+        stats = self.repository.get_file_stats(commit_hash, file_path)
         changes_data = []
         for file, changes in stats.items():
             if not file_path or file == file_path:
@@ -91,22 +163,14 @@ class Visualizer:
 
     def visualize_file_types(self) -> List[List[str]]:
         """Визуализация типов файлов"""
-        files = self.repository.get_files()
-        file_types = {}
-        total_files = len(files)
-
-        for file in files:
-            ext = os.path.splitext(file)[1].lower()
-            if ext:
-                file_types[ext] = file_types.get(ext, 0) + 1
-            else:
-                file_types['без расширения'] = file_types.get('без расширения', 0) + 1
+        file_types = self.repository.get_file_types()
+        total_files = sum(file_types.values())
 
         file_type_data = []
-        for ext, count in sorted(file_types.items(), key=lambda x: x[1], reverse=True):
+        for ext, count in file_types.most_common():
             percentage = (count / total_files) * 100
             file_type_data.append([
-                ext or 'без расширения',
+                ext,
                 str(count),
                 f"{percentage:.1f}%"
             ])
@@ -114,79 +178,154 @@ class Visualizer:
 
     def visualize_activity_stats(self) -> List[List[str]]:
         """Визуализация статистики активности"""
-        commits = self.repository.get_commits()
-        stats = {}
-        
-        for commit in commits:
-            author = commit.author.name
-            stats[author] = stats.get(author, 0) + 1
+        stats = self.repository.get_author_counts()
+        return [[author, str(count)] for author, count in stats.most_common()]
+
+    def analyze_file_work_time(self, file_path: str = None) -> List[List[str]]:
+        """Период работы над файлами: первое и последнее изменение, количество коммитов"""
+        file_times = {}
+        for committed_date, paths in self.repository.iter_file_changes(file_path):
+            for path in paths:
+                times = file_times.get(path)
+                if times is None:
+                    file_times[path] = [committed_date, committed_date, 1]
+                else:
+                    # Порядок git log не гарантирует монотонность дат, поэтому min/max
+                    times[0] = min(times[0], committed_date)
+                    times[1] = max(times[1], committed_date)
+                    times[2] += 1
+
+        work_time_data = []
+        for path, (first, last, commits) in sorted(file_times.items(), key=lambda x: x[1][2], reverse=True):
+            work_time_data.append([
+                path,
+                format_timestamp(first),
+                format_timestamp(last),
+                str((last - first) // 86400),
+                str(commits)
+            ])
+        return work_time_data
+
+    def find_lost_commits(self) -> List[List[str]]:
+        """Поиск коммитов, на которые не ссылается ни одна ветка или тег"""
+        return [
+            [hexsha[:8], author, format_timestamp(committed_date), summary]
+            for hexsha, author, committed_date, summary in self.repository.iter_lost_commits()
+        ]
 
-        activity_data = []
-        for author, count in sorted(stats.items(), key=lambda x: x[1], reverse=True):
-            activity_data.append([author, str(count)])
-        return activity_data
+    def analyze_branch_conflicts(self, branch_name: str = None) -> List[List[str]]:
+        """Файлы, по-разному измененные в текущей и указанной ветке с момента их расхождения"""
+        head = self.repository.resolve_commit('HEAD')
+        other = self.repository.resolve_commit(branch_name or 'HEAD')
+        if head == other:
+            return []
+        base = self.repository.get_merge_base(head, other)
+        # Если одна ветка - предок другой, слияние сводится к перемотке и конфликтов нет
+        if base is None or base in (head, other):
+            return []
+        ours = self.repository.get_changes_since(base, head)
+        theirs = self.repository.get_changes_since(base, other)
+
+        conflicts_data = []
+        for path in sorted(ours.keys() & theirs.keys()):
+            our_blob, our_insertions, our_deletions = ours[path]
+            their_blob, their_insertions, their_deletions = theirs[path]
+            # Одинаковые изменения в обеих ветках конфликта не дают
+            if our_blob != their_blob:
+                conflicts_data.append([
+                    path,
+                    f"+{our_insertions} -{our_deletions}",
+                    f"+{their_insertions} -{their_deletions}"
+                ])
+        return conflicts_data
+
+    def search_in_files(self, query: str) -> List[List[str]]:
+        """Поиск по содержимому отслеживаемых файлов"""
+        exclude_extensions = sorted(SEARCH_SKIP_EXTENSIONS)
+        output = self.repository.rg_files(query, exclude_extensions=exclude_extensions)
+        if output is not None:
+            return [[file] for file in output]
+        try:
+            output = self.repository.grep_files(query, exclude_extensions=exclude_extensions)
+        except GitCommandError as e:
+            if e.status == 1:  # git grep не нашел совпадений
+                return []
+            return self._search_in_files_python(query)
+        return [[file] for file in output]
 
-    def analyze_file_work_time(self, file_path: str = None) -> Any:
-        return []
+    def _search_in_files_python(self, query: str) -> List[List[str]]:
+        """Поиск по содержимому файлов средствами Python (если git grep недоступен)"""
+        files = []
+        paths = []
+        for file in self.repository.get_files():
+            if os.path.splitext(file)[1].lower() in SEARCH_SKIP_EXTENSIONS:
+                continue
+            path = os.path.join(self.repository.working_dir, file)
+            try:
+                size = os.stat(path).st_size
+            except OSError:
+                continue
+            # Пустые и слишком большие (обычно сгенерированные) файлы не открываем
+            if 0 < size <= SEARCH_MAX_FILE_SIZE:
+                files.append(file)
+                paths.append(path)
+        pattern = _case_insensitive_pattern(query)
 
-    def find_lost_commits(self) -> Any:
-        return []
+        results = []
+        with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_scan_worker, initargs=(pattern,)) as executor:
+            chunksize = max(1, len(paths) // ((os.cpu_count() or 1) * 4))
+            for file, match in zip(files, executor.map(_scan_file, paths, chunksize=chunksize)):
+                if match:
+                    results.append([file])
+        return results
 
-    def analyze_branch_conflicts(self, branch_name: str = None) -> Any:
-        return []
+    def search_commits(self, query: str, limit: int = 25) -> Iterator[List[str]]:
+        """Поиск коммитов по сообщению с ранжированием BM25; строки выдаются по мере нахождения"""
+        commit_index = self._get_commit_index()
+        ranked = commit_index.search_index.search(query, limit=limit)
+        if ranked:
+            for index in ranked:
+                yield self._format_commit_row(commit_index.commits[index])
+            return
+        # Совпадений по словам нет - ищем подстроку (например, часть слова) средствами git log --grep
+        for commit in self.repository.grep_log(query, max_count=limit):
+            yield self._format_commit_row(commit)
 
-    def search_in_files(self, query: str) -> Any:
-        return []
+    def _get_commit_index(self) -> CommitIndex:
+        """Индекс коммитов на время сессии; перестраивается, когда HEAD сдвигается"""
+        head = self.repository.get_last_commit().hexsha
+        if self._commit_index is None or self._commit_index.head != head:
+            commits = self.repository.get_log()
+            search_index = self.repository.commit_cache.get_search_index(head)
+            if search_index is None:
+                search_index = CommitSearchIndex(message for _, _, _, message in commits)
+                self.repository.commit_cache.put_search_index(head, search_index)
+            self._commit_index = CommitIndex(head, commits, search_index)
+        return self._commit_index
 
-    def search_commits(self, query: str) -> Any:
-        return []
+    def _format_commit_row(self, commit: tuple) -> List[str]:
+        hexsha, author, committed_date, message = commit
+        return [
+            hexsha[:8],
+            author,
+            format_timestamp(committed_date),
+            message.partition('\n')[0]
+        ]
 
     def show_diff(self, commit_hash: str = None, file_path: str = None) -> str:
         """Показать различия между версиями файлов"""
         try:
-            diffs = self.repository.get_diff(commit_hash, file_path)
+            # git уже построил unified-патч: содержимое версий не читается и не сравнивается заново
+            diffs = self.repository.get_diff(commit_hash, file_path, create_patch=True)
             if not diffs:
                 return ""
 
             diff_output = []
             for diff in diffs:
-                if diff.a_path and diff.b_path:
-                    diff_output.append(f"Файл: {diff.a_path}")
-                    
-                    # Получаем содержимое старой и новой версии
-                    old_content = diff.a_blob.data_stream.read().decode('utf-8', errors='replace') if diff.a_blob else ""
-                    new_content = diff.b_blob.data_stream.read().decode('utf-8', errors='replace') if diff.b_blob else ""
-                    
-                    # Разбиваем на строки
-                    old_lines = old_content.splitlines()
-                    new_lines = new_content.splitlines()
-                    
-                    # Создаем таблицу для отображения различий
-                    table = Table(show_header=False, box=None, padding=(0, 1))
-                    table.add_column("Старая версия", style=self.theme.get_color('error'), width=50)
-                    table.add_column("Новая версия", style=self.theme.get_color('success'), width=50)
-                    
-                    # Используем SequenceMatcher для определения различий
-                    from difflib import SequenceMatcher
-                    matcher = SequenceMatcher(None, old_lines, new_lines)
-                    
-                    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-                        if tag == 'equal':
-                            for i in range(i1, i2):
-                                table.add_row(old_lines[i], new_lines[j1 + (i - i1)])
-                        elif tag == 'delete':
-                            for i in range(i1, i2):
-                                table.add_row(old_lines[i], "")
-                        elif tag == 'insert':
-                            for j in range(j1, j2):
-                                table.add_row("", new_lines[j])
-                        elif tag == 'replace':
-                            for i, j in zip(range(i1, i2), range(j1, j2)):
-                                table.add_row(old_lines[i], new_lines[j])
-                    
-                    diff_output.append(str(table))
-                    diff_output.append("")  # Пустая строка для разделения
+                if diff.a_path or diff.b_path:
+                    diff_output.append(f"Файл: {diff.b_path or diff.a_path}")
+                    diff_output.append((diff.diff or b'').decode('utf-8', errors='replace'))
 
             return "\n".join(diff_output)
         except Exception as e:
-            return f"Ошибка при получении diff: {str(e)}" 
\ No newline at end of file
+            return f"Ошибка при получении diff: {str(e)}" 
@@ -1,23 +1,39 @@
 import os
 import sys
-from datetime import datetime
-from typing import Dict, Any, List, Optional
-from prompt_toolkit import PromptSession
-from prompt_toolkit.completion import WordCompleter
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-from rich.syntax import Syntax
-from difflib import SequenceMatcher
+from collections import defaultdict
+from functools import cached_property, partial
+from itertools import chain, zip_longest
+from typing import Dict, Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+from core.dates import format_timestamp
 from core.repository import GitRepository
 from core.settings import Settings
-from core.theme import Theme
+from core.theme import THEMES, Theme
+from rich.markup import escape
 from ui.console import ConsoleUI
 from ui.prompts import Prompts
-from features.analysis import CodeAnalyzer
-from features.visualization import Visualizer
-from features.documentation import DocumentationGenerator
-from features.ci_cd import CICDSetup
+
+# Сколько последних коммитов предлагать при интерактивном выборе
+COMMIT_SELECT_LIMIT = 20
+
+HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".gitwizard_history")
+
+class Command(NamedTuple):
+    """Команда интерактивного режима: из нее строятся обработчики, автодополнение и справка"""
+    name: str
+    # (GitWizard, аргументы, строка аргументов) -> None; None - команда обрабатывается в цикле run
+    handler: Optional[Callable[['GitWizard', List[str], str], None]]
+    usage: str
+    description: str
+    category: str
+    options: Tuple[str, ...] = ()
+
+    @property
+    def completions(self) -> Optional[Dict[str, None]]:
+        """Варианты аргумента для автодополнения"""
+        if self.options:
+            return dict.fromkeys(self.options)
+        # Аргумент без фиксированных значений: подсказывать нечего, но продолжение допустимо
+        return {"": None} if self.usage != self.name else None
 
 class GitWizard:
     def __init__(self, repo_path: str = "."):
@@ -27,79 +43,41 @@ class GitWizard:
         self.ui = ConsoleUI(self.theme)
         
         try:
-            with self.ui.print_progress(description="Инициализация GitWizard...") as progress:
-                self.repo = GitRepository(self.repo_path)
+            # Открытие репозитория занимает миллисекунды: индикатор прогресса обошелся бы дороже
+            self.repo = GitRepository(self.repo_path)
         except ValueError as e:
-            self.ui.print_error(f"Ошибка инициализации: {str(e)}")
+            self.ui.print_error(f"Ошибка инициализации: {escape(str(e))}")
             sys.exit(1)
         
-        history_file = os.path.join(os.path.expanduser("~"), ".gitwizard_history")
         current_style = self.theme.get_style(self.theme.get_current_theme())
-        self.prompts = Prompts(history_file=history_file, style=current_style, ui=self.ui)
-        
-        self.commands = {
-            "graph": None,
-            "history": None,
-            "commit-graph": None,
-            "worktime": {
-                "": None,
-            },
-            "lost-commits": None,
-            "conflicts": {
-                "": None,
-            },
-            "changes": {
-                "": None,
-            },
-            "diff": {
-                "": None,
-            },
-            "filesearch": {
-                "": None,
-            },
-            "filetypes": None,
-            "search": {
-                "": None,
-            },
-            "stats": None,
-            "security": {
-                "": None,
-            },
-            "docs": {
-                "md": None,
-                "html": None,
-            },
-            "performance": {
-                "": None,
-            },
-            "ci-cd": {
-                "github": None,
-                "gitlab": None,
-                "circle": None,
-                "travis": None,
-            },
-            "theme": {
-                theme for theme in self.theme.get_available_themes()
-            },
-            "settings": {
-                "show": None,
-                "save": None,
-                "reset": None,
-            },
-            "ide": {
-                "vscode": None,
-                "pycharm": None,
-                "sublime": None,
-            },
-            "help": None,
-            "exit": None,
+        self.prompts = Prompts(history_file=HISTORY_FILE, style=current_style, ui=self.ui, commands=COMPLETIONS)
+
+        # Обработчики команд: (аргументы, строка аргументов) -> None
+        self.command_handlers = {
+            command.name: partial(command.handler, self)
+            for command in COMMAND_TABLE if command.handler
         }
-        self.prompts.completer = self.prompts.get_completer()
 
-        self.analyzer = CodeAnalyzer(self.repo)
-        self.visualizer = Visualizer(self.repo, self.theme)
-        self.docs = DocumentationGenerator(self.repo)
-        self.ci_cd = CICDSetup(self.repo)
+    # Модули функционала импортируются при первом обращении, чтобы не замедлять запуск
+    @cached_property
+    def analyzer(self):
+        from features.analysis import CodeAnalyzer, MAX_FILE_KB
+        return CodeAnalyzer(self.repo, max_file_kb=self.settings.get('max_file_kb', MAX_FILE_KB))
+
+    @cached_property
+    def visualizer(self):
+        from features.visualization import Visualizer
+        return Visualizer(self.repo, self.theme)
+
+    @cached_property
+    def docs(self):
+        from features.documentation import DocumentationGenerator
+        return DocumentationGenerator(self.repo)
+
+    @cached_property
+    def ci_cd(self):
+        from features.ci_cd import CICDSetup
+        return CICDSetup(self.repo)
 
     def show_welcome(self):
         """Показывает приветственное сообщение"""
@@ -113,26 +91,7 @@ class GitWizard:
 
     def show_help(self):
         """Показывает справку по командам"""
-        commands_info = [
-            ("Анализ кода", "complexity [файл]", "Анализ сложности кода"),
-            ("Анализ кода", "duplicates [мин_длина]", "Поиск дубликатов кода"),
-            ("Анализ кода", "security [файл]", "Анализ безопасности кода"),
-            ("Анализ кода", "performance [файл]", "Анализ производительности"),
-            ("Визуализация", "graph", "Визуализация графа коммитов"),
-            ("Визуализация", "history", "История коммитов"),
-            ("Визуализация", "changes [коммит]", "Изменения в коммите"),
-            ("Визуализация", "filetypes", "Статистика по типам файлов"),
-            ("Документация", "docs [md/html]", "Генерация документации"),
-            ("Документация", "export [json/yaml]", "Экспорт статистики"),
-            ("CI/CD", "ci-cd [github/gitlab/circle/travis]", "Настройка CI/CD"),
-            ("Настройки", "theme [тема]", "Изменение цветовой темы"),
-            ("Настройки", "settings [show/save/reset]", "Управление настройками"),
-            ("Настройки", "ide [vscode/pycharm/sublime]", "Интеграция с IDE"),
-            ("Общие", "help", "Показать эту справку"),
-            ("Общие", "exit", "Выход из программы")
-        ]
-
-        table_rows = [[cat, cmd, desc] for cat, cmd, desc in commands_info]
+        table_rows = [[command.category, command.usage, command.description] for command in COMMAND_TABLE]
         self.ui.print_table("Доступные команды", ["Категория", "Команда", "Описание"], table_rows)
 
     def show_tips(self):
@@ -173,167 +132,14 @@ class GitWizard:
                     else:
                         continue
                 
-                if command == "help":
-                    self.show_help()
-                    continue
-
                 parts = command.split(maxsplit=1)
                 cmd = parts[0].lower()
                 args_str = parts[1] if len(parts) > 1 else ""
                 args = args_str.split()
 
-                if cmd == "status":
-                    self.show_status()
-                
-                elif cmd == "graph":
-                    self.visualize_branches()
-                
-                elif cmd == "history":
-                    self.visualize_history()
-                
-                elif cmd == "commit-graph":
-                    self.visualize_commit_graph()
-                
-                elif cmd == "worktime":
-                    file_path = args[0] if args else None
-                    self.analyze_file_work_time(file_path)
-
-                elif cmd == "lost-commits":
-                    self.find_lost_commits()
-
-                elif cmd == "conflicts":
-                    branch_name = args[0] if args else self.prompts.select_branch(self.repo.get_branches())
-                    if branch_name:
-                         self.analyze_branch_conflicts(branch_name)
-
-                elif cmd == "changes":
-                    commit_hash = args[0] if args else self.prompts.select_commit([c.hexsha for c in self.repo.get_commits()])
-                    if commit_hash:
-                        file_path = args[1] if len(args) > 1 else None
-                        self.analyze_changes(commit_hash=commit_hash, file_path=file_path)
-
-                elif cmd == "diff":
-                    commit_hash = args[0] if args else self.prompts.select_commit([c.hexsha for c in self.repo.get_commits()])
-                    if commit_hash:
-                        file_path = args[1] if len(args) > 1 else None
-                        self.show_diff(commit_hash=commit_hash, file_path=file_path)
-
-                elif cmd == "filesearch":
-                     query = args_str
-                     if query:
-                         self.search_in_files(query)
-                     else:
-                          self.ui.print_warning("Укажите строку для поиска")
-
-                elif cmd == "filetypes":
-                    self.analyze_file_types()
-
-                elif cmd == "search":
-                    query = args_str
-                    if query:
-                        self.search_commits(query)
-                    else:
-                        self.ui.print_warning("Укажите строку для поиска")
-
-                elif cmd == "stats":
-                    self.show_activity_stats()
-                
-                elif cmd == "complexity":
-                    file = args[0] if args else None
-                    self.analyze_code_complexity(file)
-                
-                elif cmd == "duplicates":
-                    # Проверяем, является ли аргумент числом для min_length
-                    if args and args[0].isdigit():
-                        min_length = int(args[0])
-                        self.find_code_duplicates(min_length)
-                    elif not args:
-                        # Нет аргументов, используем значение по умолчанию
-                        self.find_code_duplicates()
-                    else:
-                        # Аргумент не является числом, выводим сообщение об ошибке
-                        self.ui.print_error(f"Неверный аргумент для 'duplicates': {args[0]}. Ожидается число.")
-                        self.ui.print_info("Использование: duplicates [мин_длина]")
-                
-                elif cmd == "security":
-                    file = args[0] if args else None
-                    self.analyze_security(file)
-                
-                elif cmd == "performance":
-                    file = args[0] if args else None
-                    self.analyze_performance(file)
-                
-                elif cmd == "docs":
-                    format = args[0] if args else "md"
-                    if format not in ['md', 'html']:
-                         self.ui.print_error(f"Неподдерживаемый формат: {format}. Доступные: md, html")
-                    else:
-                         self.generate_documentation(format)
-                
-                elif cmd == "export":
-                    format = args[0] if args else "json"
-                    if format not in ['json', 'yaml']:
-                         self.ui.print_error(f"Неподдерживаемый формат: {format}. Доступные: json, yaml")
-                    else:
-                        self.export_stats(format)
-                
-                elif cmd == "ci-cd":
-                    platform = args[0] if args else "github"
-                    supported_platforms = ['github', 'gitlab', 'circle', 'travis']
-                    if platform not in supported_platforms:
-                        self.ui.print_error(f"Неизвестная платформа: {platform}. Поддерживаемые: {', '.join(supported_platforms)}")
-                    else:
-                         self.setup_ci_cd(platform)
-                
-                elif cmd == "theme":
-                    theme_name = args[0] if args else None
-                    if not theme_name:
-                        self.ui.print_warning("Укажите название темы. Доступные: light, dark, monokai, solarized")
-                    else:
-                        if self.theme.set_theme(theme_name):
-                            self.prompts.session.style = self.theme.get_style(theme_name)
-                            self.ui.print_success(f"Тема изменена на {theme_name}")
-                        else:
-                            self.ui.print_error(f"Неизвестная тема: {theme_name}")
-                
-                elif cmd == "settings":
-                    action = args[0] if args else "show"
-                    if action == "show":
-                         all_settings = self.settings.get_all()
-                         settings_data = [[key, str(value)] for key, value in all_settings.items()]
-                         self.ui.print_table("Настройки", ["Настройка", "Значение"], settings_data)
-                    elif action == "save":
-                         if self.settings.save_settings():
-                             self.ui.print_success("Настройки сохранены")
-                         else:
-                              self.ui.print_error("Не удалось сохранить настройки")
-                    elif action == "reset":
-                        self.settings.reset()
-                        self.ui.print_success("Настройки сброшены к значениям по умолчанию")
-                    else:
-                         self.ui.print_error(f"Неизвестное действие: {action}. Доступные действия: show, save, reset")
-                
-                elif cmd == "ide":
-                    ide_name = args[0] if args else self.prompts.select_ide(['vscode', 'pycharm', 'sublime'])
-                    supported_ides = ["vscode", "pycharm", "sublime"]
-                    if ide_name:
-                        if ide_name in supported_ides:
-                            try:
-                                current_ide_settings = self.settings.get('ide_integration', {})
-                                for key in current_ide_settings:
-                                    current_ide_settings[key] = False
-                                current_ide_settings[ide_name] = True
-
-                                self.settings.set('ide_integration', current_ide_settings)
-                                self.settings.save_settings()
-                                self.ui.print_success(f"Интеграция с {ide_name} настроена")
-                            except Exception as e:
-                                self.ui.print_error(f"Ошибка при настройке интеграции с IDE: {str(e)}")
-                        else:
-                            self.ui.print_error(f"Неподдерживаемая IDE: {ide_name}. Поддерживаемые: {', '.join(supported_ides)}")
-                    else:
-                         self.ui.print_warning("Укажите название IDE")
-
+                handler = self.command_handlers.get(cmd)
+                if handler:
+                    handler(args, args_str)
                 else:
                     self.ui.print_error(f"Неизвестная команда: {cmd}")
                     self.ui.print_info("Введите 'help' для получения списка команд")
@@ -343,23 +149,144 @@ class GitWizard:
             except EOFError:
                 break
             except Exception as e:
-                self.ui.print_error(f"Произошла ошибка: {str(e)}")
+                self.ui.print_error(f"Произошла ошибка: {escape(str(e))}")
 
         self.ui.print_info("До свидания!")
 
+    def _handle_conflicts(self, args: List[str], args_str: str):
+        branch_name = args[0] if args else self.prompts.select_branch(self.repo.get_branches())
+        if branch_name:
+            self.analyze_branch_conflicts(branch_name)
+
+    def _handle_changes(self, args: List[str], args_str: str):
+        commit_hash = args[0] if args else self._select_recent_commit()
+        if commit_hash:
+            file_path = args[1] if len(args) > 1 else None
+            self.analyze_changes(commit_hash=commit_hash, file_path=file_path)
+
+    def _handle_diff(self, args: List[str], args_str: str):
+        commit_hash = args[0] if args else self._select_recent_commit()
+        if commit_hash:
+            file_path = args[1] if len(args) > 1 else None
+            self.show_diff(commit_hash=commit_hash, file_path=file_path)
+
+    def _select_recent_commit(self) -> Optional[str]:
+        """Выбор одного из последних коммитов; из истории читаются только показываемые записи"""
+        commits = {
+            f"{hexsha[:8]} {summary}": hexsha
+            for hexsha, summary in self.repo.iter_log(max_count=COMMIT_SELECT_LIMIT, fields=('hexsha', 'summary'))
+        }
+        choice = self.prompts.select_commit(list(commits))
+        return commits[choice] if choice else None
+
+    def _handle_filesearch(self, args: List[str], args_str: str):
+        if args_str:
+            self.search_in_files(args_str)
+        else:
+            self.ui.print_warning("Укажите строку для поиска")
+
+    def _handle_search(self, args: List[str], args_str: str):
+        query, limit_flag, limit = args_str.rpartition("--limit")
+        if not limit_flag or not limit.strip().isdigit():
+            query, limit = args_str, "25"
+        query = query.strip()
+        if query:
+            self.search_commits(query, int(limit))
+        else:
+            self.ui.print_warning("Укажите строку для поиска")
+
+    def _handle_duplicates(self, args: List[str], args_str: str):
+        # Проверяем, является ли аргумент числом для min_length
+        if args and args[0].isdigit():
+            self.find_code_duplicates(int(args[0]))
+        elif not args:
+            # Нет аргументов, используем значение по умолчанию
+            self.find_code_duplicates()
+        else:
+            # Аргумент не является числом, выводим сообщение об ошибке
+            self.ui.print_error(f"Неверный аргумент для 'duplicates': {args[0]}. Ожидается число.")
+            self.ui.print_info("Использование: duplicates [мин_длина]")
+
+    def _handle_docs(self, args: List[str], args_str: str):
+        format = args[0] if args else "md"
+        if format not in ['md', 'html']:
+            self.ui.print_error(f"Неподдерживаемый формат: {format}. Доступные: md, html")
+        else:
+            self.generate_documentation(format)
+
+    def _handle_export(self, args: List[str], args_str: str):
+        format = args[0] if args else "json"
+        if format not in ['json', 'yaml']:
+            self.ui.print_error(f"Неподдерживаемый формат: {format}. Доступные: json, yaml")
+        else:
+            self.export_stats(format)
+
+    def _handle_ci_cd(self, args: List[str], args_str: str):
+        platform = args[0] if args else "github"
+        supported_platforms = ['github', 'gitlab', 'circle', 'travis']
+        if platform not in supported_platforms:
+            self.ui.print_error(f"Неизвестная платформа: {platform}. Поддерживаемые: {', '.join(supported_platforms)}")
+        else:
+            self.setup_ci_cd(platform)
+
+    def _handle_theme(self, args: List[str], args_str: str):
+        theme_name = args[0] if args else None
+        if not theme_name:
+            self.ui.print_warning("Укажите название темы. Доступные: light, dark, monokai, solarized")
+        elif self.theme.set_theme(theme_name):
+            self.prompts.session.style = self.theme.get_style(theme_name)
+            self.ui.print_success(f"Тема изменена на {theme_name}")
+        else:
+            self.ui.print_error(f"Неизвестная тема: {theme_name}")
+
+    def _handle_settings(self, args: List[str], args_str: str):
+        action = args[0] if args else "show"
+        if action == "show":
+            all_settings = self.settings.get_all()
+            settings_data = [[key, str(value)] for key, value in all_settings.items()]
+            self.ui.print_table("Настройки", ["Настройка", "Значение"], settings_data)
+        elif action == "save":
+            if self.settings.save_settings():
+                self.ui.print_success("Настройки сохранены")
+            else:
+                self.ui.print_error("Не удалось сохранить настройки")
+        elif action == "reset":
+            self.settings.reset()
+            self.ui.print_success("Настройки сброшены к значениям по умолчанию")
+        else:
+            self.ui.print_error(f"Неизвестное действие: {action}. Доступные действия: show, save, reset")
+
+    def _handle_ide(self, args: List[str], args_str: str):
+        ide_name = args[0] if args else self.prompts.select_ide(['vscode', 'pycharm', 'sublime'])
+        supported_ides = ["vscode", "pycharm", "sublime"]
+        if not ide_name:
+            self.ui.print_warning("Укажите название IDE")
+        elif ide_name not in supported_ides:
+            self.ui.print_error(f"Неподдерживаемая IDE: {ide_name}. Поддерживаемые: {', '.join(supported_ides)}")
+        else:
+            try:
+                current_ide_settings = self.settings.get('ide_integration', {})
+                for key in current_ide_settings:
+                    current_ide_settings[key] = False
+                current_ide_settings[ide_name] = True
+
+                self.settings.set('ide_integration', current_ide_settings)
+                self.settings.save_settings()
+                self.ui.print_success(f"Интеграция с {ide_name} настроена")
+            except Exception as e:
+                self.ui.print_error(f"Ошибка при настройке интеграции с IDE: {escape(str(e))}")
+
     def show_status(self):
         """Показать текущий статус репозитория"""
         try:
             current_branch = self.repo.active_branch
             self.ui.print_panel(f"[bold green]Текущая ветка: {current_branch}[/bold green]", title="Статус", style_type='info')
             
-            if self.repo.is_dirty:
+            modified_files, untracked_files = self.repo.get_status()
+            if modified_files or untracked_files:
                 self.ui.print_warning("Есть несохраненные изменения:")
                 
                 table_data = []
-                modified_files = self.repo.get_modified_files()
-                untracked_files = self.repo.get_untracked_files()
-
                 for item in modified_files:
                     table_data.append(["Изменен", item])
                 
@@ -370,16 +297,16 @@ class GitWizard:
             else:
                 self.ui.print_success("Рабочая директория чиста")
             
-            last_commit = self.repo.get_last_commit()
+            hexsha, author, committed_date, summary = next(self.repo.iter_log(max_count=1))
             commit_info = (f"[bold]Последний коммит:[/bold]\n"
-                           f"Хеш: [{self.theme.get_color('cyan')}]{last_commit.hexsha[:8]}[/]\n"
-                           f"Автор: [{self.theme.get_color('green')}]{last_commit.author.name}[/]\n"
-                           f"Дата: [{self.theme.get_color('warning')}]{datetime.fromtimestamp(last_commit.committed_date).strftime('%Y-%m-%d %H:%M')}[/]\n"
-                           f"Сообщение: [{self.theme.get_color('foreground')}]{last_commit.message.split('\n')[0]}[/]")
+                           f"Хеш: [{self.theme.get_color('cyan')}]{hexsha[:8]}[/]\n"
+                           f"Автор: [{self.theme.get_color('green')}]{escape(author)}[/]\n"
+                           f"Дата: [{self.theme.get_color('warning')}]{format_timestamp(committed_date)}[/]\n"
+                           f"Сообщение: [{self.theme.get_color('foreground')}]{escape(summary)}[/]")
             self.ui.print_panel(commit_info, style_type='info')
             
         except Exception as e:
-            self.ui.print_error(f"Ошибка при получении статуса: {str(e)}")
+            self.ui.print_error(f"Ошибка при получении статуса: {escape(str(e))}")
 
     def visualize_branches(self):
         """Визуализация веток в виде дерева"""
@@ -387,7 +314,7 @@ class GitWizard:
             tree = self.visualizer.visualize_branches()
             self.ui.console.print(tree)
         except Exception as e:
-            self.ui.print_error(f"Ошибка при визуализации веток: {str(e)}")
+            self.ui.print_error(f"Ошибка при визуализации веток: {escape(str(e))}")
 
     def visualize_history(self):
         """Визуализация истории коммитов"""
@@ -396,7 +323,7 @@ class GitWizard:
             header = ["Хеш", "Автор", "Дата", "Сообщение"]
             self.ui.print_table("История коммитов", header, history_data)
         except Exception as e:
-            self.ui.print_error(f"Ошибка при визуализации истории: {str(e)}")
+            self.ui.print_error(f"Ошибка при визуализации истории: {escape(str(e))}")
 
     def visualize_commit_graph(self):
         """Визуализация графа коммитов"""
@@ -404,28 +331,53 @@ class GitWizard:
             graph_table = self.visualizer.visualize_commit_graph()
             self.ui.console.print(graph_table)
         except Exception as e:
-            self.ui.print_error(f"Ошибка при визуализации графа: {str(e)}")
+            self.ui.print_error(f"Ошибка при визуализации графа: {escape(str(e))}")
 
     def analyze_file_work_time(self, file_path: Optional[str] = None):
         """Анализ времени работы над файлами"""
         try:
-            self.ui.print_warning("Функционал анализа времени работы пока не адаптирован к новой структуре.")
+            work_time_data = self.visualizer.analyze_file_work_time(file_path)
+            if work_time_data:
+                header = ["Файл", "Первое изменение", "Последнее изменение", "Дней", "Коммитов"]
+                self.ui.print_table("Время работы над файлами", header, work_time_data)
+            else:
+                self.ui.print_info("Изменений не найдено.")
         except Exception as e:
-             self.ui.print_error(f"Ошибка при анализе времени работы: {str(e)}")
+             self.ui.print_error(f"Ошибка при анализе времени работы: {escape(str(e))}")
 
     def find_lost_commits(self):
         """Поиск 'потерянных' коммитов"""
         try:
-            self.ui.print_warning("Функционал поиска потерянных коммитов пока не адаптирован к новой структуре.")
+            lost_commits = self.visualizer.find_lost_commits()
+            if lost_commits:
+                header = ["Хеш", "Автор", "Дата", "Сообщение"]
+                self.ui.print_table("Потерянные коммиты", header, lost_commits)
+            else:
+                self.ui.print_success("Потерянных коммитов не найдено")
+        except Exception as e:
+             self.ui.print_error(f"Ошибка при поиске потерянных коммитов: {escape(str(e))}")
+
+    def optimize_repository(self):
+        """Запись вспомогательных индексов git для быстрого чтения истории"""
+        try:
+            self.repo.write_commit_graph()
+            self.ui.print_success("commit-graph записан: история и логи по файлам будут читаться быстрее")
         except Exception as e:
-             self.ui.print_error(f"Ошибка при поиске потерянных коммитов: {str(e)}")
+             self.ui.print_error(f"Ошибка при записи commit-graph: {escape(str(e))}")
 
     def analyze_branch_conflicts(self, branch_name: Optional[str] = None):
         """Анализ потенциальных конфликтов в ветках"""
         try:
-            self.ui.print_warning("Функционал анализа конфликтов пока не адаптирован к новой структуре.")
+            conflicts_data = self.visualizer.analyze_branch_conflicts(branch_name)
+            if conflicts_data:
+                # При отсоединенном HEAD active_branch недоступен: сравнение идет с 'HEAD'
+                current_branch = self.repo._head_state()[0]
+                header = ["Файл", f"Изменения в {current_branch}", f"Изменения в {branch_name}"]
+                self.ui.print_table("Возможные конфликты", header, conflicts_data)
+            else:
+                self.ui.print_success("Конфликтующих изменений не найдено")
         except Exception as e:
-             self.ui.print_error(f"Ошибка при анализе конфликтов: {str(e)}")
+             self.ui.print_error(f"Ошибка при анализе конфликтов: {escape(str(e))}")
 
     def analyze_changes(self, commit_hash: Optional[str] = None, file_path: Optional[str] = None):
         """Анализ изменений в файлах"""
@@ -434,18 +386,18 @@ class GitWizard:
             header = ["Файл", "Добавлено", "Удалено"]
             self.ui.print_table("Изменения", header, changes_data)
         except Exception as e:
-              self.ui.print_error(f"Ошибка при анализе изменений: {str(e)}")
+              self.ui.print_error(f"Ошибка при анализе изменений: {escape(str(e))}")
 
     def search_in_files(self, query: str):
         """Поиск по содержимому файлов"""
         try:
             results = self.visualizer.search_in_files(query)
             if results:
-                self.ui.print_table(f"Результаты поиска: {query}", ["Файл"], results)
+                self.ui.print_table(f"Результаты поиска: {escape(query)}", ["Файл"], results)
             else:
-                self.ui.print_info(f"Ничего не найдено по запросу: {query}")
+                self.ui.print_info(f"Ничего не найдено по запросу: {escape(query)}")
         except Exception as e:
-             self.ui.print_error(f"Ошибка при поиске в файлах: {str(e)}")
+             self.ui.print_error(f"Ошибка при поиске в файлах: {escape(str(e))}")
 
     def analyze_file_types(self):
         """Анализ типов файлов в репозитории"""
@@ -454,14 +406,21 @@ class GitWizard:
             header = ["Тип файла", "Количество", "Процент"]
             self.ui.print_table("Статистика по типам файлов", header, file_type_stats)
         except Exception as e:
-              self.ui.print_error(f"Ошибка при анализе типов файлов: {str(e)}")
+              self.ui.print_error(f"Ошибка при анализе типов файлов: {escape(str(e))}")
 
-    def search_commits(self, query: str):
-        """Поиск коммитов по сообщению или содержимому"""
+    def search_commits(self, query: str, limit: int = 25):
+        """Поиск коммитов по сообщению"""
         try:
-            self.ui.print_warning("Функционал поиска коммитов пока не адаптирован к новой структуре.")
+            results = self.visualizer.search_commits(query, limit)
+            first = next(results, None)
+            if first is not None:
+                # Выводим строки по мере нахождения, не дожидаясь конца поиска
+                header = ["Хеш", "Автор", "Дата", "Сообщение"]
+                self.ui.print_table_live(f"Результаты поиска: {escape(query)}", header, chain([first], results))
+            else:
+                self.ui.print_info(f"Ничего не найдено по запросу: {escape(query)}")
         except Exception as e:
-             self.ui.print_error(f"Ошибка при поиске коммитов: {str(e)}")
+             self.ui.print_error(f"Ошибка при поиске коммитов: {escape(str(e))}")
 
     def show_activity_stats(self):
         """Показать статистику активности по авторам"""
@@ -470,13 +429,13 @@ class GitWizard:
             header = ["Автор", "Количество коммитов"]
             self.ui.print_table("Статистика активности", header, activity_stats)
         except Exception as e:
-             self.ui.print_error(f"Ошибка при показе статистики активности: {str(e)}")
+             self.ui.print_error(f"Ошибка при показе статистики активности: {escape(str(e))}")
 
     def show_diff(self, commit_hash: Optional[str] = None, file_path: Optional[str] = None):
         """Показать различия между версиями файлов"""
         try:
             # Получаем raw diffs напрямую из репозитория
-            diffs = self.repo.get_diff(commit_hash, file_path)
+            diffs = self.repo.get_diff(commit_hash, file_path, create_patch=True)
 
             if not diffs:
                 self.ui.print_info("Изменений не найдено.")
@@ -484,71 +443,78 @@ class GitWizard:
 
             self.ui.print_panel("Изменения (Diff)")
 
-            # Адаптируем логику форматирования из visualization.py
-            from difflib import SequenceMatcher # Импорт здесь, чтобы не зависеть от visualization.py
             from rich.table import Table # Импорт Rich Table здесь
-            import os # Импорт os здесь
+            from rich.text import Text
 
             for diff in diffs:
-                if diff.a_path and diff.b_path:
-                    self.ui.print_info(f"Файл: {diff.a_path}")
-
-                    # Получаем содержимое старой и новой версии
-                    old_content = diff.a_blob.data_stream.read().decode('utf-8', errors='replace') if diff.a_blob else ""
-                    new_content = diff.b_blob.data_stream.read().decode('utf-8', errors='replace') if diff.b_blob else ""
+                if diff.a_path or diff.b_path:
+                    patch = diff.diff or b''
+                    # Двоичные файлы git определяет сам и вместо патча пишет одну строку
+                    if patch.startswith(b'Binary files'):
+                        self.ui.print_info(f"Файл: {diff.b_path or diff.a_path} (двоичный файл)")
+                        self.ui.console.print("")
+                        continue
 
-                    # Разбиваем на строки
-                    old_lines = old_content.splitlines()
-                    new_lines = new_content.splitlines()
+                    # Патч начинается с заголовка ханка, поэтому строки +/- считаем прямо по байтам
+                    insertions = patch.count(b'\n+')
+                    deletions = patch.count(b'\n-')
+                    self.ui.print_info(f"Файл: {diff.b_path or diff.a_path} (+{insertions} -{deletions})")
 
                     # Создаем таблицу для отображения различий
                     table = Table(show_header=False, box=None, padding=(0, 1))
                     table.add_column("Старая версия", style=self.theme.get_color('error'), width=50)
                     table.add_column("Новая версия", style=self.theme.get_color('success'), width=50)
 
-                    # Используем SequenceMatcher для определения различий
-                    matcher = SequenceMatcher(None, old_lines, new_lines)
-
-                    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-                        if tag == 'equal':
-                            for i in range(i1, i2):
-                                table.add_row(old_lines[i], new_lines[j1 + (i - i1)])
-                        elif tag == 'delete':
-                            for i in range(i1, i2):
-                                table.add_row(old_lines[i], "")
-                        elif tag == 'insert':
-                            for j in range(j1, j2):
-                                table.add_row("", new_lines[j])
-                        elif tag == 'replace':
-                            for i, j in zip(range(i1, i2), range(j1, j2)):
-                                table.add_row(old_lines[i], new_lines[j])
+                    # Раскладываем готовый патч git по колонкам: удаленные и добавленные
+                    # строки одного блока выводятся друг напротив друга
+                    removed, added = [], []
+                    for line in patch.decode('utf-8', errors='replace').splitlines() + ['']:
+                        if line.startswith('-'):
+                            removed.append(line[1:])
+                            continue
+                        if line.startswith('+'):
+                            added.append(line[1:])
+                            continue
+                        for old_line, new_line in zip_longest(removed, added, fillvalue=""):
+                            table.add_row(Text(old_line), Text(new_line))
+                        removed, added = [], []
+                        if line.startswith('@@'):
+                            table.add_row(Text(line.split(' @@', 1)[0] + ' @@', style='dim'), "")
+                        elif line.startswith(' '):
+                            table.add_row(Text(line[1:]), Text(line[1:]))
 
                     # Печатаем таблицу напрямую
                     self.ui.console.print(table)
                     self.ui.console.print("") # Пустая строка для разделения между файлами
 
         except Exception as e:
-             self.ui.print_error(f"Ошибка при показе изменений: {str(e)}")
+             self.ui.print_error(f"Ошибка при показе изменений: {escape(str(e))}")
 
     def analyze_code_complexity(self, file_path: Optional[str] = None):
         """Анализ сложности кода"""
         try:
-            results = self.analyzer.analyze_complexity(file_path)
-            if results:
-                table_rows = [[r['file'], str(r['code_lines']), str(r['functions']), str(r['complexity'])] for r in results]
-                self.ui.print_table("Анализ сложности кода", ["Файл", "Строк кода", "Функций", "Сложность"], table_rows)
-            else:
-                self.ui.print_info("Файлы для анализа сложности не найдены или произошла ошибка.")
+            self._print_complexity(self.analyzer.analyze_complexity(file_path))
         except Exception as e:
-             self.ui.print_error(f"Ошибка при анализе сложности кода: {str(e)}")
+             self.ui.print_error(f"Ошибка при анализе сложности кода: {escape(str(e))}")
+
+    def _print_complexity(self, results: Iterable[Dict[str, Any]]):
+        """Вывод результатов анализа сложности"""
+        table_rows = ([r['file'], str(r['code_lines']), str(r['functions']), str(r['complexity'])] for r in results)
+        first = next(table_rows, None)
+        if first is not None:
+            # Строки выводятся по мере разбора файлов
+            self.ui.print_table_live("Анализ сложности кода", ["Файл", "Строк кода", "Функций", "Сложность"], chain([first], table_rows))
+        else:
+            self.ui.print_info("Файлы для анализа сложности не найдены или произошла ошибка.")
 
     def find_code_duplicates(self, min_length: int = 5):
         """Поиск дубликатов кода"""
         try:
             results = self.analyzer.find_duplicates(min_length)
-            if results:
+            first = next(results, None)
+            if first is not None:
                 self.ui.print_panel("Найдены дубликаты кода:", style_type='warning')
-                for item in results:
+                for item in chain([first], results):
                     self.ui.print_panel(item['fragment'], title="Дубликат", style_type='warning')
                     self.ui.print_info("Встречается в:")
                     occurrences_data = [[file, str(line)] for file, line in item['occurrences']]
@@ -556,67 +522,93 @@ class GitWizard:
             else:
                 self.ui.print_success("Дубликатов кода не найдено")
         except Exception as e:
-             self.ui.print_error(f"Ошибка при поиске дубликатов: {str(e)}")
+             self.ui.print_error(f"Ошибка при поиске дубликатов: {escape(str(e))}")
 
     def analyze_dependencies(self):
         """Анализ зависимостей проекта"""
         try:
-            self.ui.print_warning("Функционал анализа зависимостей пока не адаптирован к новой структуре.")
+            dependencies = self.analyzer.analyze_dependencies()
+            if dependencies:
+                table_rows = [
+                    [module, str(len(files)), ", ".join(files[:3]) + (" ..." if len(files) > 3 else "")]
+                    for module, files in dependencies.items()
+                ]
+                self.ui.print_table("Зависимости проекта", ["Пакет", "Файлов", "Где используется"], table_rows, styles={'Пакет': self.theme.get_color('cyan'), 'Файлов': self.theme.get_color('green'), 'Где используется': self.theme.get_color('foreground')})
+            else:
+                self.ui.print_info("Внешние пакеты в импортах Python не найдены")
         except Exception as e:
-             self.ui.print_error(f"Ошибка при анализе зависимостей: {str(e)}")
+             self.ui.print_error(f"Ошибка при анализе зависимостей: {escape(str(e))}")
 
     def export_stats(self, format: str = 'json'):
         """Экспорт статистики"""
         try:
             self.ui.print_warning("Функционал экспорта статистики пока не адаптирован к новой структуре.")
         except Exception as e:
-             self.ui.print_error(f"Ошибка при экспорте статистики: {str(e)}")
+             self.ui.print_error(f"Ошибка при экспорте статистики: {escape(str(e))}")
 
     def analyze_security(self, file_path: Optional[str] = None):
         """Анализ безопасности кода"""
         try:
-            results = self.analyzer.analyze_security(file_path)
-            if results:
-                self.ui.print_panel("Найдены потенциальные проблемы безопасности:", style_type='error')
-                
-                issues_by_type = defaultdict(list)
-                for issue in results:
-                    issues_by_type[issue['issue_type']].append(issue)
-                
-                for issue_type, occurrences in issues_by_type.items():
-                    self.ui.print_warning(f"\n{issue_type}:")
-                    table_rows = [[item['file'], str(item['line']), item['code']] for item in occurrences]
-                    self.ui.print_table("", ["Файл", "Строка", "Код"], table_rows, styles={'Файл': self.theme.get_color('cyan'), 'Строка': self.theme.get_color('green'), 'Код': self.theme.get_color('foreground')})
-            else:
-                self.ui.print_success("Потенциальных проблем безопасности не найдено")
+            self._print_security(self.analyzer.analyze_security(file_path))
         except Exception as e:
-             self.ui.print_error(f"Ошибка при анализе безопасности: {str(e)}")
+             self.ui.print_error(f"Ошибка при анализе безопасности: {escape(str(e))}")
+
+    def _print_security(self, results: Iterable[Dict[str, Any]]):
+        """Вывод результатов анализа безопасности"""
+        issues_by_type = defaultdict(list)
+        for issue in results:
+            issues_by_type[issue['issue_type']].append(issue)
+        
+        if issues_by_type:
+            self.ui.print_panel("Найдены потенциальные проблемы безопасности:", style_type='error')
+            
+            for issue_type, occurrences in issues_by_type.items():
+                self.ui.print_warning(f"\n{issue_type}:")
+                table_rows = [[item['file'], str(item['line']), item['code']] for item in occurrences]
+                self.ui.print_table("", ["Файл", "Строка", "Код"], table_rows, styles={'Файл': self.theme.get_color('cyan'), 'Строка': self.theme.get_color('green'), 'Код': self.theme.get_color('foreground')})
+        else:
+            self.ui.print_success("Потенциальных проблем безопасности не найдено")
 
     def generate_documentation(self, format: str = 'md'):
         """Генерация документации проекта"""
         try:
              self.ui.print_warning("Функционал генерации документации пока не адаптирован к новой структуре.")
         except Exception as e:
-             self.ui.print_error(f"Ошибка при генерации документации: {str(e)}")
+             self.ui.print_error(f"Ошибка при генерации документации: {escape(str(e))}")
 
     def analyze_performance(self, file_path: Optional[str] = None):
         """Анализ производительности кода"""
         try:
-            results = self.analyzer.analyze_performance(file_path)
-            if results:
-                table_rows = [[r['file'], str(r['loops']), str(r['recursion']), str(r['max_nesting'])] for r in results]
-                self.ui.print_table("Анализ производительности", ["Файл", "Циклы", "Рекурсия", "Вложенность"], table_rows, styles={'Файл': self.theme.get_color('cyan'), 'Циклы': self.theme.get_color('warning'), 'Рекурсия': self.theme.get_color('magenta'), 'Вложенность': self.theme.get_color('success')})
-            else:
-                 self.ui.print_info("Файлы для анализа производительности не найдены или произошла ошибка.")
+            self._print_performance(self.analyzer.analyze_performance(file_path))
+        except Exception as e:
+             self.ui.print_error(f"Ошибка при анализе производительности: {escape(str(e))}")
+
+    def _print_performance(self, results: Iterable[Dict[str, Any]]):
+        """Вывод результатов анализа производительности"""
+        table_rows = ([r['file'], str(r['loops']), str(r['recursion']), str(r['max_nesting'])] for r in results)
+        first = next(table_rows, None)
+        if first is not None:
+            # Строки выводятся по мере разбора файлов
+            self.ui.print_table_live("Анализ производительности", ["Файл", "Циклы", "Рекурсия", "Вложенность"], chain([first], table_rows), styles={'Файл': self.theme.get_color('cyan'), 'Циклы': self.theme.get_color('warning'), 'Рекурсия': self.theme.get_color('magenta'), 'Вложенность': self.theme.get_color('success')})
+        else:
+             self.ui.print_info("Файлы для анализа производительности не найдены или произошла ошибка.")
+
+    def analyze_all(self, file_path: Optional[str] = None):
+        """Сложность, безопасность и производительность кода за один проход по файлам"""
+        try:
+            report = self.analyzer.analyze_all(file_path)
+            self._print_complexity(report['complexity'])
+            self._print_security(report['security'])
+            self._print_performance(report['performance'])
         except Exception as e:
-             self.ui.print_error(f"Ошибка при анализе производительности: {str(e)}")
+             self.ui.print_error(f"Ошибка при анализе кода: {escape(str(e))}")
 
     def setup_ci_cd(self, platform: str = 'github'):
         """Настройка CI/CD для проекта"""
         try:
             self.ui.print_warning("Функционал настройки CI/CD пока не адаптирован к новой структуре.")
         except Exception as e:
-             self.ui.print_error(f"Ошибка при настройке CI/CD: {str(e)}")
+             self.ui.print_error(f"Ошибка при настройке CI/CD: {escape(str(e))}")
 
     def get_project_description(self) -> str:
         """Получение описания проекта"""
@@ -634,6 +626,69 @@ class GitWizard:
          """Получение зависимостей проекта"""
          return {}
 
+# Все команды интерактивного режима в порядке вывода справки
+COMMAND_TABLE: List[Command] = [
+    Command("status", lambda app, args, args_str: app.show_status(),
+            "status", "Текущая ветка, несохраненные изменения и последний коммит", "Репозиторий"),
+    Command("stats", lambda app, args, args_str: app.show_activity_stats(),
+            "stats", "Статистика активности по авторам", "Репозиторий"),
+    Command("worktime", lambda app, args, args_str: app.analyze_file_work_time(args[0] if args else None),
+            "worktime [файл]", "Время работы над файлами", "Репозиторий"),
+    Command("lost-commits", lambda app, args, args_str: app.find_lost_commits(),
+            "lost-commits", "Поиск 'потерянных' коммитов", "Репозиторий"),
+    Command("conflicts", GitWizard._handle_conflicts,
+            "conflicts [ветка]", "Потенциальные конфликты с веткой", "Репозиторий"),
+    Command("graph", lambda app, args, args_str: app.visualize_branches(),
+            "graph", "Дерево веток", "Визуализация"),
+    Command("history", lambda app, args, args_str: app.visualize_history(),
+            "history", "История коммитов", "Визуализация"),
+    Command("commit-graph", lambda app, args, args_str: app.visualize_commit_graph(),
+            "commit-graph", "Визуализация графа коммитов", "Визуализация"),
+    Command("changes", GitWizard._handle_changes,
+            "changes [коммит] [файл]", "Изменения в коммите", "Визуализация"),
+    Command("diff", GitWizard._handle_diff,
+            "diff [коммит] [файл]", "Патч коммита", "Визуализация"),
+    Command("filetypes", lambda app, args, args_str: app.analyze_file_types(),
+            "filetypes", "Статистика по типам файлов", "Визуализация"),
+    Command("search", GitWizard._handle_search,
+            "search <запрос> [--limit N]", "Поиск коммитов по сообщению", "Поиск"),
+    Command("filesearch", GitWizard._handle_filesearch,
+            "filesearch <строка>", "Поиск по содержимому файлов", "Поиск"),
+    Command("complexity", lambda app, args, args_str: app.analyze_code_complexity(args[0] if args else None),
+            "complexity [файл]", "Анализ сложности кода", "Анализ кода"),
+    Command("duplicates", GitWizard._handle_duplicates,
+            "duplicates [мин_длина]", "Поиск дубликатов кода", "Анализ кода"),
+    Command("security", lambda app, args, args_str: app.analyze_security(args[0] if args else None),
+            "security [файл]", "Анализ безопасности кода", "Анализ кода"),
+    Command("performance", lambda app, args, args_str: app.analyze_performance(args[0] if args else None),
+            "performance [файл]", "Анализ производительности", "Анализ кода"),
+    Command("analyze", lambda app, args, args_str: app.analyze_all(args[0] if args else None),
+            "analyze [файл]", "Сложность, безопасность и производительность сразу", "Анализ кода"),
+    Command("dependencies", lambda app, args, args_str: app.analyze_dependencies(),
+            "dependencies", "Внешние пакеты в импортах Python", "Анализ кода"),
+    Command("docs", GitWizard._handle_docs,
+            "docs [md/html]", "Генерация документации", "Документация", ("md", "html")),
+    Command("export", GitWizard._handle_export,
+            "export [json/yaml]", "Экспорт статистики", "Документация", ("json", "yaml")),
+    Command("ci-cd", GitWizard._handle_ci_cd,
+            "ci-cd [github/gitlab/circle/travis]", "Настройка CI/CD", "CI/CD",
+            ("github", "gitlab", "circle", "travis")),
+    Command("theme", GitWizard._handle_theme,
+            "theme [тема]", "Изменение цветовой темы", "Настройки", tuple(THEMES)),
+    Command("settings", GitWizard._handle_settings,
+            "settings [show/save/reset]", "Управление настройками", "Настройки", ("show", "save", "reset")),
+    Command("ide", GitWizard._handle_ide,
+            "ide [vscode/pycharm/sublime]", "Интеграция с IDE", "Настройки", ("vscode", "pycharm", "sublime")),
+    Command("optimize", lambda app, args, args_str: app.optimize_repository(),
+            "optimize", "Записать commit-graph для ускорения работы с историей", "Настройки"),
+    Command("help", lambda app, args, args_str: app.show_help(),
+            "help", "Показать эту справку", "Общие"),
+    Command("exit", None, "exit", "Выход из программы", "Общие"),
+]
+
+# Дерево автодополнения для prompt_toolkit
+COMPLETIONS: Dict[str, Any] = {command.name: command.completions for command in COMMAND_TABLE}
+
 def main():
     wizard = GitWizard()
     wizard.run()
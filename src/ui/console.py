@@ -1,12 +1,13 @@
 from rich.console import Console
+from rich.markup import escape
 from rich.panel import Panel
-from rich.table import Table
-from rich.text import Text
-from rich.syntax import Syntax
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, TYPE_CHECKING
 from core.theme import Theme
 
+if TYPE_CHECKING:
+    from rich.progress import Progress
+    from rich.table import Table
+
 class ConsoleUI:
     def __init__(self, theme: Theme):
         self.console = Console()
@@ -19,25 +20,52 @@ class ConsoleUI:
 
     def print_table(self, title: str, columns: List[str], rows: List[List[str]], styles: Dict[str, str] = None) -> None:
         """Вывод таблицы с учетом темы"""
+        table = self._create_table(title, columns, styles)
+
+        # Стиль ячеек задают колонки; промежуточные объекты Text на каждую ячейку не нужны.
+        # Ячейки - данные (пути, авторы, сообщения коммитов), а не разметка rich
+        for row in rows:
+            table.add_row(*(escape(str(cell)) for cell in row))
+
+        self.console.print(table)
+
+    def print_table_live(self, title: str, columns: List[str], rows: Iterable[List[str]], styles: Dict[str, str] = None) -> int:
+        """Потоковый вывод таблицы: строки появляются по мере получения"""
+        from rich.live import Live
+
+        table = self._create_table(title, columns, styles)
+        count = 0
+        with Live(table, console=self.console, refresh_per_second=4):
+            for row in rows:
+                table.add_row(*(escape(str(cell)) for cell in row))
+                count += 1
+        if not self.console.is_terminal:
+            # Вне терминала Live не переводит строку после последнего кадра
+            self.console.line()
+        return count
+
+    def _create_table(self, title: str, columns: List[str], styles: Dict[str, str] = None) -> 'Table':
+        """Создание таблицы с колонками в стиле текущей темы"""
+        # rich.table нужен только при выводе таблиц, на чистом рабочем дереве запуск обходится без него
+        from rich.table import Table
+
         table = Table(title=title, show_header=True, header_style=f"bold {self.theme.get_color('accent')}")
-        
         for col in columns:
             col_style = styles.get(col, self.theme.get_color('cyan')) if styles else self.theme.get_color('cyan')
             table.add_column(col, style=col_style)
-        
-        for row in rows:
-            styled_row = [Text(str(item), style=self.theme.get_color('foreground')) for item in row]
-            table.add_row(*[str(item) for item in styled_row])
-        
-        self.console.print(table)
+        return table
 
     def print_syntax(self, code: str, language: str = "python", theme_name: str = "monokai") -> None:
         """Вывод кода с подсветкой синтаксиса"""
+        from rich.syntax import Syntax
+
         syntax = Syntax(code, language, theme=theme_name)
         self.console.print(syntax)
 
-    def print_progress(self, description: str) -> Progress:
+    def print_progress(self, description: str) -> 'Progress':
         """Создание индикатора прогресса"""
+        from rich.progress import Progress, SpinnerColumn, TextColumn
+
         return Progress(
             SpinnerColumn(),
             TextColumn(f"[{self.theme.get_color('accent')}][progress.description]{{task.description}}[/{self.theme.get_color('accent')}]"),
@@ -63,6 +91,7 @@ class ConsoleUI:
     def print_diff(self, old_text: str, new_text: str) -> None:
         """Вывод различий в тексте с учетом темы"""
         from difflib import SequenceMatcher
+        from rich.table import Table
         
         table = Table(show_header=False, box=None, padding=(0, 1))
         table.add_column("Старая версия", style=self.theme.get_color('error'), width=50)
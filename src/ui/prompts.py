@@ -1,78 +1,39 @@
-from typing import List, Optional, Dict, Any
-from prompt_toolkit import PromptSession
-from prompt_toolkit.completion import WordCompleter, NestedCompleter
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.styles import Style
-from rich.prompt import Prompt, Confirm
+from functools import cached_property
+from typing import List, Optional, Dict, Any, TYPE_CHECKING
 from ui.console import ConsoleUI
 
+if TYPE_CHECKING:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.completion import NestedCompleter
+    from prompt_toolkit.styles import Style
+
 class Prompts:
-    def __init__(self, history_file: str, style: Style, ui: ConsoleUI):
-        self.session = PromptSession(history=FileHistory(history_file))
+    def __init__(self, history_file: str, style: 'Style', ui: ConsoleUI, commands: Dict[str, Any]):
+        self.history_file = history_file
         self.style = style
         self.ui = ui
-        self.commands = self._create_commands_dict()
-
-    def _create_commands_dict(self) -> Dict[str, Any]:
-        """Создание словаря команд для автодополнения"""
-        return {
-            "graph": None,
-            "history": None,
-            "commit-graph": None,
-            "worktime": {
-                "": None,
-            },
-            "lost-commits": None,
-            "conflicts": {
-                "": None,
-            },
-            "changes": {
-                "": None,
-            },
-            "diff": {
-                "": None,
-            },
-            "filesearch": {
-                "": None,
-            },
-            "filetypes": None,
-            "search": {
-                "": None,
-            },
-            "stats": None,
-            "security": {
-                "": None,
-            },
-            "docs": {
-                "md": None,
-                "html": None,
-            },
-            "performance": {
-                "": None,
-            },
-            "ci-cd": {
-                "github": None,
-                "gitlab": None,
-            },
-            "theme": {
-                "light": None,
-                "dark": None,
-                "monokai": None,
-                "solarized": None,
-            },
-            "settings": {
-                "show": None,
-                "save": None,
-                "reset": None,
-            },
-            "help": None,
-            "exit": None,
-        }
-
-    def get_completer(self) -> NestedCompleter:
-        """Получение комплитера для команд"""
+        # Дерево команд для автодополнения: {команда: {аргумент: ...} или None}
+        self.commands = commands
+
+    @cached_property
+    def session(self) -> 'PromptSession':
+        """Сессия ввода создается только при первом интерактивном запросе"""
+        from prompt_toolkit import PromptSession
+        from prompt_toolkit.history import FileHistory
+
+        return PromptSession(history=FileHistory(self.history_file))
+
+    @cached_property
+    def completer(self) -> 'NestedCompleter':
+        """Комплитер строится один раз при первом обращении"""
+        from prompt_toolkit.completion import NestedCompleter
+
         return NestedCompleter.from_nested_dict(self.commands)
 
+    def get_completer(self) -> 'NestedCompleter':
+        """Получение комплитера для команд"""
+        return self.completer
+
     def prompt(self, message: str = "gitwizard> ", auto_complete: bool = True) -> str:
         """Запрос ввода команды"""
         return self.session.prompt(
@@ -83,10 +44,14 @@ class Prompts:
 
     def confirm(self, message: str) -> bool:
         """Запрос подтверждения"""
+        from rich.prompt import Confirm
+
         return Confirm.ask(message, console=self.ui.console)
 
     def select_from_list(self, items: List[str], message: str) -> Optional[str]:
         """Выбор элемента из списка"""
+        from rich.prompt import Prompt
+
         if not items:
             return None
 